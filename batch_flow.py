@@ -0,0 +1,299 @@
+import argparse
+import json
+import logging
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from zipfile import BadZipFile, ZipFile
+
+from pipeline_flow import VERBOSITY_LEVELS, run_pipeline
+from src.data import accounts_rollup
+from src.data.initial_data_unzip_extraction import get_zip_member
+from src.visualization.create_visualizations import initialize_render_worker
+
+
+BATCH_PATH = os.path.join(os.path.dirname(__file__), 'data', 'batch')
+
+
+def get_account_name(zip_path):
+    """
+    Get the name of an account from the name of its zip file.
+
+    Parameters
+    ----------
+    zip_path: str
+        Path of the zip file given by netflix.
+
+    Returns
+    -------
+    account: str
+        Name of the account.
+    """
+    return os.path.splitext(os.path.basename(zip_path))[0]
+
+
+def get_export_error(export_path):
+    """
+    Checks that a file is a netflix export: a zip file with the viewing
+     activity inside.
+
+    Parameters
+    ----------
+    export_path: str
+        Path of the file.
+
+    Returns
+    -------
+    error: str
+        Why the file is not a netflix export, None if it is one.
+    """
+    try:
+        with ZipFile(export_path, 'r') as zip_f:
+            get_zip_member(zip_f)
+    except BadZipFile:
+        return 'It is not a zip file.'
+    except KeyError as error:
+        return error.args[0]
+    return None
+
+
+def get_exports(exports_path):
+    """
+    Get the netflix exports of a folder and the files that are skipped
+     because they are not exports (see get_export_error).
+
+    Parameters
+    ----------
+    exports_path: str
+        Folder with the zip files given by netflix.
+
+    Returns
+    -------
+    zip_paths: list
+        Sorted paths of the netflix exports.
+    skipped: list
+        Path of each skipped file and the reason why it is skipped.
+    """
+    zip_paths = []
+    skipped = []
+    for file_name in sorted(os.listdir(exports_path)):
+        export_path = os.path.join(exports_path, file_name)
+        if not os.path.isfile(export_path):
+            continue
+        error = get_export_error(export_path)
+        if error:
+            logging.warning(f'Skipping {export_path}: {error}')
+            skipped.append({'path': export_path, 'error': error})
+        else:
+            zip_paths.append(export_path)
+    return zip_paths, skipped
+
+
+def get_account_paths(output_path, account):
+    """
+    Get the paths where the outputs of an account are saved, so the outputs
+     of different accounts never collide.
+
+    Parameters
+    ----------
+    output_path: str
+        Folder of the batch.
+    account: str
+        Name of the account.
+
+    Returns
+    -------
+    account_paths: dict
+        Folders of the interim data and the reports of the account and path
+         of its metrics.
+    """
+    account_path = os.path.join(output_path, account)
+    account_paths = {
+        'interim_data_path': os.path.join(account_path, 'interim'),
+        'report_path': os.path.join(account_path, 'reports'),
+        'metrics_path': os.path.join(
+            account_path, 'reports', 'pipeline_metrics.json'
+        ),
+    }
+    return account_paths
+
+
+def run_account(zip_path, output_path, **kwargs):
+    """
+    Runs the whole pipeline for the zip file of one account, with its
+     outputs in its own folder inside output_path (see get_account_paths).
+
+    Parameters
+    ----------
+    zip_path: str
+        Path of the zip file given by netflix.
+    output_path: str
+        Folder of the batch.
+    kwargs:
+        Other parameters of run_pipeline.
+
+    Returns
+    -------
+    account_stats: dict
+        Name of the account, folder of its interim data and time (in
+         seconds) its pipeline took.
+    """
+    account = get_account_name(zip_path)
+    account_paths = get_account_paths(output_path, account)
+    logging.info(f'Running the pipeline of account {account}.')
+    pipeline_stats = run_pipeline(zip_path=zip_path, **account_paths, **kwargs)
+    account_stats = {
+        'account': account,
+        'interim_data_path': account_paths['interim_data_path'],
+        'total_time': sum(stats['wall_time'] for stats in pipeline_stats),
+    }
+    return account_stats
+
+
+def run_batch(exports_path, output_path=BATCH_PATH, executor=None, workers=0,
+              **kwargs):
+    """
+    Runs the pipeline for every zip file (one per account) in a folder and
+     rolls up the movie and series summaries of all the accounts (see
+     accounts_rollup.process). A failed account is logged and left out of
+     the rollup, it does not stop the other accounts. The files of the
+     folder that are not netflix exports are skipped before running anything
+     (see get_export_error).
+
+    Parameters
+    ----------
+    exports_path: str
+        Folder with the zip files given by netflix.
+    output_path: str
+        Folder where each account gets its own folder and the rollups are
+         saved (in the rollup folder).
+    executor: concurrent.futures.Executor
+        Executor that runs the accounts. Any object with a submit method that
+         returns futures can be given (for example the client of a cluster).
+         The accounts must run in separate processes, since the metrics of
+         each pipeline are kept by process. By default a pool of processes
+         is used.
+    workers: int
+        Number of processes of the default executor. With 1 the accounts are
+         processed one after another in this process and with 0 every
+         available core is used.
+    kwargs:
+        Other parameters of run_pipeline.
+
+    Returns
+    -------
+    batch_stats: dict
+        Statistics of each processed account, the zip files that failed and
+         the skipped files (with the reason why they are not exports).
+    """
+    zip_paths, skipped = get_exports(exports_path)
+    logging.info(f'Found {len(zip_paths)} accounts in {exports_path}.')
+    if workers == 0:
+        workers = os.cpu_count()
+    own_executor = executor is None and workers > 1
+    if own_executor:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=initialize_render_worker,
+        )
+    # Each account renders its figures in one process, the parallelism is
+    # given by the accounts.
+    kwargs['workers'] = 1
+    accounts_stats = []
+    failed = []
+    try:
+        if executor is None:
+            initialize_render_worker()
+            futures = None
+        else:
+            futures = [
+                executor.submit(run_account, zip_path, output_path, **kwargs)
+                for zip_path in zip_paths
+            ]
+        for number, zip_path in enumerate(zip_paths):
+            try:
+                if futures is None:
+                    account_stats = run_account(zip_path, output_path, **kwargs)
+                else:
+                    account_stats = futures[number].result()
+            except Exception:
+                logging.exception(f'The pipeline of {zip_path} failed.')
+                failed.append(zip_path)
+                continue
+            accounts_stats.append(account_stats)
+    finally:
+        if own_executor:
+            executor.shutdown()
+    accounts_rollup.process(
+        {
+            account_stats['account']: account_stats['interim_data_path']
+            for account_stats in accounts_stats
+        },
+        os.path.join(output_path, 'rollup'),
+    )
+    batch_stats = {
+        'accounts': accounts_stats,
+        'failed': failed,
+        'skipped': skipped,
+    }
+    with open(os.path.join(output_path, 'batch_metrics.json'), 'w') as file:
+        json.dump(batch_stats, file, indent=4)
+    logging.info(
+        f'Processed {len(accounts_stats)} accounts ({len(failed)} failed, '
+        f'{len(skipped)} files skipped).'
+    )
+    return batch_stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Run the netflix pipeline for a folder of accounts.'
+    )
+    parser.add_argument(
+        'exports_path', help='Folder with the zip files given by netflix.'
+    )
+    parser.add_argument(
+        '--output-path',
+        default=BATCH_PATH,
+        help='Folder of the outputs of each account and of the rollups.',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=0,
+        help='Processes used to run the accounts (0 uses every core).',
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Run every stage even if its inputs did not change.',
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only ingest the rows that are newer than the last ingestion.',
+    )
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        help='Process the netflix data in chunks of this number of rows.',
+    )
+    parser.add_argument(
+        '--verbosity',
+        choices=list(VERBOSITY_LEVELS),
+        default='normal',
+        help='Amount of logs (verbose adds per-chunk and sampled logs).',
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=VERBOSITY_LEVELS[args.verbosity])
+    for library in ['matplotlib', 'PIL']:
+        logging.getLogger(library).setLevel(
+            max(VERBOSITY_LEVELS[args.verbosity], logging.INFO)
+        )
+    run_batch(
+        args.exports_path,
+        output_path=args.output_path,
+        workers=args.workers,
+        force=args.force,
+        incremental=args.incremental,
+        chunksize=args.chunksize,
+    )
@@ -0,0 +1,219 @@
+import argparse
+import logging
+import numpy as np
+import pandas as pd
+
+from time import perf_counter
+
+
+VIEWING_ACTIVITY_COLUMNS = [
+    'Profile Name',
+    'Start Time',
+    'Duration',
+    'Attributes',
+    'Title',
+    'Supplemental Video Type',
+    'Device Type',
+    'Bookmark',
+    'Latest Bookmark',
+    'Country',
+]
+PROFILE_NAMES = [
+    'Ana', 'Bruno', 'Carla', 'Diego', 'Elena', 'Fabian', 'Gala', 'Hugo',
+]
+DEVICE_TYPES = [
+    'Chrome PC (Cadmium)',
+    'Netflix Windows App - Cadmium Windows Mobile',
+    'Samsung 2017 Kant-S UHD TV Smart TV',
+    'Apple iPhone XR',
+]
+SUPPLEMENTAL_VIDEO_TYPES = ['TRAILER', 'HOOK', 'TEASER_TRAILER']
+AUTOPLAY_ATTRIBUTE = 'Autoplayed: user action: None; '
+COUNTRY = 'MX (Mexico)'
+SECONDS_IN_DAY = 86400
+CHUNKSIZE = 1000000
+
+
+def get_duration_strings(seconds):
+    """
+    Get the durations with the HH:MM:SS format used by netflix.
+
+    Parameters
+    ----------
+    seconds: np.ndarray
+        Durations in seconds.
+
+    Returns
+    -------
+    durations: pd.Series
+        Durations as strings.
+    """
+    seconds = pd.Series(seconds)
+    hours = (seconds // 3600).astype(str).str.zfill(2)
+    minutes = (seconds % 3600 // 60).astype(str).str.zfill(2)
+    seconds = (seconds % 60).astype(str).str.zfill(2)
+    return hours + ':' + minutes + ':' + seconds
+
+
+def generate_viewing_activity(rows, profiles=3, series_ratio=0.6,
+                              autoplay_ratio=0.1, supplemental_ratio=0.05,
+                              titles=500, start='2016-01-01', days=2920,
+                              seed=0):
+    """
+    Generates a synthetic ViewingActivity dataframe with the same columns and
+     formats as the one given by netflix. Rows are sorted from the newest to
+     the oldest, just like in the real file.
+
+    Parameters
+    ----------
+    rows: int
+        Number of rows.
+    profiles: int
+        Number of profiles of the account.
+    series_ratio: float
+        Proportion of rows that are episodes of a series (the rest are
+         movies).
+    autoplay_ratio: float
+        Proportion of rows that were autoplayed.
+    supplemental_ratio: float
+        Proportion of rows that are supplemental videos (trailers, hooks...).
+    titles: int
+        Number of different series and of different movies.
+    start: str
+        Date of the first register.
+    days: int
+        Number of days between the first and the last register.
+    seed: int
+        Seed of the random generator.
+
+    Returns
+    -------
+    viewing_activity: pd.DataFrame
+        Synthetic viewing activity.
+    """
+    rng = np.random.default_rng(seed)
+    profile_names = np.array(PROFILE_NAMES[:profiles] + [
+        f'Profile {number}'
+        for number in range(len(PROFILE_NAMES), profiles)
+    ])
+    seconds = np.sort(
+        rng.integers(0, int(days * SECONDS_IN_DAY), rows)
+    )[::-1]
+    start_times = pd.Timestamp(start) + pd.to_timedelta(seconds, unit='s')
+
+    is_serie = rng.random(rows) < series_ratio
+    series_titles = (
+        'Series ' + pd.Series(rng.integers(0, titles, rows)).astype(str)
+        + ': Season ' + pd.Series(rng.integers(1, 6, rows)).astype(str)
+        + ': Episode ' + pd.Series(rng.integers(1, 13, rows)).astype(str)
+    )
+    movie_titles = 'Movie ' + pd.Series(
+        rng.integers(0, titles, rows)
+    ).astype(str)
+    title = series_titles.where(is_serie, movie_titles)
+
+    duration_seconds = rng.integers(1, 7200, rows)
+    bookmark_seconds = np.minimum(
+        duration_seconds + rng.integers(0, 600, rows), 2 * 7200
+    )
+    is_autoplay = rng.random(rows) < autoplay_ratio
+    is_supplemental = rng.random(rows) < supplemental_ratio
+    supplemental = np.where(
+        is_supplemental,
+        rng.choice(SUPPLEMENTAL_VIDEO_TYPES, rows),
+        None,
+    )
+    viewing_activity = pd.DataFrame({
+        'Profile Name': rng.choice(profile_names, rows),
+        'Start Time': start_times.strftime('%Y-%m-%d %H:%M:%S'),
+        'Duration': get_duration_strings(duration_seconds),
+        'Attributes': np.where(is_autoplay, AUTOPLAY_ATTRIBUTE, None),
+        'Title': title,
+        'Supplemental Video Type': supplemental,
+        'Device Type': rng.choice(DEVICE_TYPES, rows),
+        'Bookmark': get_duration_strings(bookmark_seconds),
+        'Latest Bookmark': np.where(
+            rng.random(rows) < 0.8,
+            'Not latest view',
+            get_duration_strings(bookmark_seconds),
+        ),
+        'Country': COUNTRY,
+    })
+    return viewing_activity[VIEWING_ACTIVITY_COLUMNS]
+
+
+def write_viewing_activity(path, rows, chunksize=CHUNKSIZE, seed=0,
+                           days=2920, **kwargs):
+    """
+    Writes a synthetic ViewingActivity.csv file. The rows are generated and
+     written by chunks (each chunk covers an older period of time than the
+     previous one), so the memory does not grow with the number of rows.
+
+    Parameters
+    ----------
+    path: str
+        Path of the csv file.
+    rows: int
+        Number of rows.
+    chunksize: int
+        Maximum number of rows generated at the same time.
+    seed: int
+        Seed of the random generator.
+    days: int
+        Number of days between the first and the last register.
+    kwargs:
+        Other parameters of generate_viewing_activity.
+
+    Returns
+    -------
+    None
+    """
+    tick = perf_counter()
+    total_chunks = max(int(np.ceil(rows / chunksize)), 1)
+    chunk_days = days / total_chunks
+    end = pd.Timestamp(kwargs.pop('start', '2016-01-01')) \
+        + pd.Timedelta(days=days)
+    for chunk in range(total_chunks):
+        chunk_rows = min(chunksize, rows - chunk * chunksize)
+        chunk_start = end - pd.Timedelta(days=chunk_days * (chunk + 1))
+        viewing_activity = generate_viewing_activity(
+            chunk_rows,
+            start=chunk_start,
+            days=chunk_days,
+            seed=seed + chunk,
+            **kwargs,
+        )
+        viewing_activity.to_csv(
+            path, mode='w' if chunk == 0 else 'a', header=chunk == 0,
+            index=False,
+        )
+    tock = perf_counter()
+    time_it_took = tock - tick
+    logging.info(
+        f'Writing {rows} synthetic rows into {path} took {time_it_took} '
+        f'seconds.'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic ViewingActivity.csv file.'
+    )
+    parser.add_argument('path', help='Path of the csv file.')
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--profiles', type=int, default=3)
+    parser.add_argument('--series-ratio', type=float, default=0.6)
+    parser.add_argument('--autoplay-ratio', type=float, default=0.1)
+    parser.add_argument('--supplemental-ratio', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    write_viewing_activity(
+        args.path,
+        args.rows,
+        seed=args.seed,
+        profiles=args.profiles,
+        series_ratio=args.series_ratio,
+        autoplay_ratio=args.autoplay_ratio,
+        supplemental_ratio=args.supplemental_ratio,
+    )
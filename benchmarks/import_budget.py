@@ -0,0 +1,177 @@
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+
+
+PROJECT_PATH = os.path.join(os.path.dirname(__file__), '..')
+PLOTTING_MODULES = ['matplotlib', 'seaborn', 'PIL', 'sklearn']
+# Maximum import time (in seconds) of each module and the modules it must
+# not import.
+IMPORT_BUDGETS = {
+    'src.visualization.utils': {
+        'seconds': 0.1,
+        'forbidden': PLOTTING_MODULES + ['pandas', 'pyarrow'],
+    },
+    'src.visualization.create_visualizations': {
+        'seconds': 1.0,
+        'forbidden': PLOTTING_MODULES,
+    },
+    'pipeline_flow': {
+        'seconds': 1.0,
+        'forbidden': PLOTTING_MODULES,
+    },
+    'batch_flow': {
+        'seconds': 1.0,
+        'forbidden': PLOTTING_MODULES,
+    },
+}
+DEFAULT_REPEAT = 3
+TOP_MODULES = 10
+MICROSECONDS_IN_SECOND = 1e6
+
+
+def get_import_times(module):
+    """
+    Imports a module in a new python process with -X importtime and gets the
+     time it took to import each module.
+
+    Parameters
+    ----------
+    module: str
+        Name of the module.
+
+    Returns
+    -------
+    import_times: dict
+        Own and cumulative import time (in seconds) of every imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_PATH,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own_time, cumulative_time, name = line[len('import time:'):].split(
+            '|'
+        )
+        import_times[name.strip()] = {
+            'self': int(own_time) / MICROSECONDS_IN_SECOND,
+            'cumulative': int(cumulative_time) / MICROSECONDS_IN_SECOND,
+        }
+    return import_times
+
+
+def check_import_budget(module, seconds, forbidden, repeat=DEFAULT_REPEAT):
+    """
+    Measures the import time of a module (the fastest of several imports, to
+     reduce the noise) and checks it against its budget.
+
+    Parameters
+    ----------
+    module: str
+        Name of the module.
+    seconds: float
+        Maximum import time of the module.
+    forbidden: list
+        Top level packages the module must not import.
+    repeat: int
+        Number of times the module is imported.
+
+    Returns
+    -------
+    report: dict
+        Import time of the module, its slowest imported modules and the
+         budget violations.
+    """
+    import_times = min(
+        (get_import_times(module) for _ in range(repeat)),
+        key=lambda times: times[module]['cumulative'],
+    )
+    total_time = import_times[module]['cumulative']
+    slowest = sorted(
+        import_times.items(), key=lambda item: item[1]['self'], reverse=True,
+    )[:TOP_MODULES]
+    imported_forbidden = sorted({
+        name.split('.')[0] for name in import_times
+        if name.split('.')[0] in forbidden
+    })
+    violations = []
+    if total_time > seconds:
+        violations.append(
+            f'{module} took {total_time:.3f} seconds to import '
+            f'(budget: {seconds} seconds).'
+        )
+    for name in imported_forbidden:
+        violations.append(f'{module} imports {name}.')
+    report = {
+        'module': module,
+        'import_time': total_time,
+        'budget': seconds,
+        'slowest_modules': [
+            {'module': name, **times} for name, times in slowest
+        ],
+        'violations': violations,
+    }
+    logging.info(
+        f'Importing {module} took {total_time:.3f} seconds '
+        f'(budget: {seconds} seconds).'
+    )
+    return report
+
+
+def run_import_budget(budgets=None, output_path=None, repeat=DEFAULT_REPEAT):
+    """
+    Checks the import time budget of each module and saves the report.
+
+    Parameters
+    ----------
+    budgets: dict
+        Budget of each module, IMPORT_BUDGETS by default.
+    output_path: str
+        Path of the json file with the report (not saved if not given).
+    repeat: int
+        Number of times each module is imported.
+
+    Returns
+    -------
+    violations: list
+        Descriptions of the exceeded budgets.
+    """
+    reports = [
+        check_import_budget(module, repeat=repeat, **budget)
+        for module, budget in (budgets or IMPORT_BUDGETS).items()
+    ]
+    if output_path:
+        with open(output_path, 'w') as output_file:
+            json.dump(reports, output_file, indent=4)
+        logging.info(f'Import times saved into {output_path}.')
+    violations = [
+        violation for report in reports for violation in report['violations']
+    ]
+    for violation in violations:
+        logging.warning(f'Import budget exceeded: {violation}')
+    return violations
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Check the import time of the pipeline modules.'
+    )
+    parser.add_argument(
+        '--output', help='Json file where the import times are saved.'
+    )
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    found_violations = run_import_budget(
+        output_path=args.output, repeat=args.repeat
+    )
+    sys.exit(1 if found_violations else 0)
@@ -0,0 +1,516 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import pandas as pd
+
+from time import perf_counter
+from zipfile import ZipFile
+
+from benchmarks.generate_viewing_activity import write_viewing_activity
+from src.data import movies_and_series
+from src.data.fetch_information import get_duration_in_hours, read_interim_data
+from src.data.initial_data_unzip_extraction import (
+    extract_zip_files,
+    open_raw_data,
+)
+from src.data.schema import RAW_SCHEMA, read_csv
+from src.visualization import create_visualizations
+from src.visualization.utils import get_daily_data
+
+
+DEFAULT_SIZES = [10000, 1000000, 10000000]
+DEFAULT_TOLERANCE = 0.25
+# Differences smaller than this (in seconds) are considered noise.
+MIN_REGRESSION_SECONDS = 0.05
+VIEWING_ACTIVITY_PATH = 'CONTENT_INTERACTION/ViewingActivity.csv'
+# Proportion of the newest rows that are ingested by the incremental process.
+NEW_ROWS_RATIO = 0.1
+# Number of chunks in which the chunked process reads the netflix data.
+TOTAL_CHUNKS = 10
+
+
+def time_stage(timings, stage_name, function, *args, **kwargs):
+    """
+    Runs a function and saves the time it took.
+
+    Parameters
+    ----------
+    timings: dict
+        Dictionary where the time (in seconds) is saved under stage_name.
+    stage_name: str
+        Name of the stage.
+    function: callable
+        Function of the stage.
+    args, kwargs:
+        Arguments of the function.
+
+    Returns
+    -------
+    result:
+        What the function returns.
+    """
+    tick = perf_counter()
+    result = function(*args, **kwargs)
+    tock = perf_counter()
+    timings[stage_name] = round(tock - tick, 4)
+    logging.info(f'Benchmark {stage_name} took {timings[stage_name]} seconds.')
+    return result
+
+
+def write_netflix_report(viewing_activity, zip_path):
+    """
+    Writes a zip file like the one given by netflix with a viewing activity.
+
+    Parameters
+    ----------
+    viewing_activity: pd.DataFrame
+        Viewing activity with the columns of the netflix file.
+    zip_path: str
+        Path of the zip file.
+
+    Returns
+    -------
+    None
+    """
+    with ZipFile(zip_path, 'w') as zip_file:
+        zip_file.writestr(
+            VIEWING_ACTIVITY_PATH, viewing_activity.to_csv(index=False)
+        )
+
+
+def get_interim_differences(expected_path, interim_path):
+    """
+    Get the interim files that are not equal to the expected ones (same
+     values in the same order).
+
+    Parameters
+    ----------
+    expected_path: str
+        Folder with the expected interim data.
+    interim_path: str
+        Folder with the interim data to check.
+
+    Returns
+    -------
+    differences: list
+        Names of the files that are missing or different.
+    """
+    differences = []
+    for name in sorted(os.listdir(expected_path)):
+        if not name.endswith(f'.{movies_and_series.INTERIM_FORMAT}'):
+            continue
+        interim_file = os.path.join(interim_path, name)
+        if not os.path.exists(interim_file):
+            differences.append(name)
+            continue
+        # Categories and list columns (read as arrays) are compared as text.
+        expected = read_interim_data(os.path.join(expected_path, name))
+        interim = read_interim_data(interim_file)
+        if not expected.astype(str).equals(interim.astype(str)):
+            differences.append(name)
+    return differences
+
+
+def check_incremental_process(timings, zip_path, work_path):
+    """
+    Times the incremental process of the newest rows of a netflix export
+     and checks that its interim data is the same as the one of a full
+     process. The export is grouped by profile (from the newest to the
+     oldest row of each one), like the real file.
+
+    Parameters
+    ----------
+    timings: dict
+        Dictionary where the time (in seconds) is saved.
+    zip_path: str
+        Path of the zip file with the netflix export.
+    work_path: str
+        Folder where the exports and the interim data are written.
+
+    Returns
+    -------
+    None
+    """
+    with open_raw_data(zip_path) as raw_file:
+        viewing_activity = pd.read_csv(
+            raw_file, dtype=str, keep_default_na=False
+        )
+    profiles = viewing_activity['Profile Name'].unique()
+    viewing_activity = viewing_activity.iloc[
+        viewing_activity['Profile Name'].map(
+            {profile: number for number, profile in enumerate(profiles)}
+        ).argsort(kind='stable')
+    ]
+    incremental_path = os.path.join(work_path, 'incremental_interim')
+    full_path = os.path.join(work_path, 'full_interim')
+    os.makedirs(incremental_path, exist_ok=True)
+    os.makedirs(full_path, exist_ok=True)
+    start_times = viewing_activity['Start Time'].sort_values()
+    cutoff = start_times.iloc[int(len(start_times) * (1 - NEW_ROWS_RATIO))]
+    old_zip_path = os.path.join(work_path, 'old_netflix-report.zip')
+    new_zip_path = os.path.join(work_path, 'new_netflix-report.zip')
+    write_netflix_report(
+        viewing_activity[viewing_activity['Start Time'] < cutoff],
+        old_zip_path,
+    )
+    write_netflix_report(viewing_activity, new_zip_path)
+    del viewing_activity, start_times
+
+    movies_and_series.process(old_zip_path, incremental_path)
+    time_stage(
+        timings,
+        'incremental_process',
+        movies_and_series.process,
+        new_zip_path,
+        incremental_path,
+        incremental=True,
+    )
+    movies_and_series.process(new_zip_path, full_path)
+    differences = get_interim_differences(full_path, incremental_path)
+    if differences:
+        raise ValueError(
+            f'The incremental process is not equal to the full process in: '
+            f'{differences}'
+        )
+
+
+def check_chunked_process(timings, zip_path, work_path, chunksize):
+    """
+    Times the process of a netflix export in memory and in chunks, and
+     checks that both give the same interim data.
+
+    Parameters
+    ----------
+    timings: dict
+        Dictionary where the time (in seconds) is saved.
+    zip_path: str
+        Path of the zip file with the netflix export.
+    work_path: str
+        Folder where the interim data is written.
+    chunksize: int
+        Number of rows of each chunk.
+
+    Returns
+    -------
+    None
+    """
+    full_path = os.path.join(work_path, 'full_interim')
+    chunked_path = os.path.join(work_path, 'chunked_interim')
+    os.makedirs(full_path, exist_ok=True)
+    os.makedirs(chunked_path, exist_ok=True)
+    time_stage(
+        timings,
+        'movies_and_series_process',
+        movies_and_series.process,
+        zip_path,
+        full_path,
+    )
+    time_stage(
+        timings,
+        'chunked_process',
+        movies_and_series.process,
+        zip_path,
+        chunked_path,
+        chunksize=chunksize,
+    )
+    differences = get_interim_differences(full_path, chunked_path)
+    if differences:
+        raise ValueError(
+            f'The chunked process is not equal to the process in memory in: '
+            f'{differences}'
+        )
+
+
+def benchmark_size(rows, work_path, visualizations=True, **kwargs):
+    """
+    Generates a synthetic ViewingActivity.csv file with the given number of
+     rows and times each stage of the pipeline with it.
+
+    Parameters
+    ----------
+    rows: int
+        Number of rows of the synthetic file.
+    work_path: str
+        Folder where the synthetic files and the figures are written.
+    visualizations: bool
+        If True each visualization is timed too.
+    kwargs:
+        Other parameters of generate_viewing_activity.
+
+    Returns
+    -------
+    timings: dict
+        Time (in seconds) of each stage.
+    """
+    logging.info(f'Benchmarking {rows} rows.')
+    csv_path = os.path.join(work_path, f'ViewingActivity_{rows}.csv')
+    zip_path = os.path.join(work_path, f'netflix-report_{rows}.zip')
+    extract_path = os.path.join(work_path, f'netflix-report_{rows}')
+    image_path = os.path.join(work_path, f'figures_{rows}/')
+    os.makedirs(image_path, exist_ok=True)
+    write_viewing_activity(csv_path, rows, **kwargs)
+    with ZipFile(zip_path, 'w') as zip_file:
+        zip_file.write(csv_path, VIEWING_ACTIVITY_PATH)
+    os.remove(csv_path)
+
+    timings = {}
+    time_stage(
+        timings, 'extraction', extract_zip_files, zip_path, extract_path
+    )
+    time_stage(
+        timings,
+        'read_csv',
+        pd.read_csv,
+        os.path.join(extract_path, VIEWING_ACTIVITY_PATH),
+    )
+    with open_raw_data(zip_path) as raw_file:
+        time_stage(timings, 'read_csv_from_zip', pd.read_csv, raw_file)
+    with open_raw_data(zip_path) as raw_file:
+        viewing_activity = time_stage(
+            timings, 'read_csv_with_schema', read_csv, raw_file, RAW_SCHEMA
+        )
+    netflix_data = time_stage(
+        timings,
+        'process_netflix_data',
+        movies_and_series.process_netflix_data,
+        viewing_activity,
+    )
+    del viewing_activity
+    netflix_data = time_stage(
+        timings,
+        'identify_series_in_data',
+        movies_and_series.identify_series_in_data,
+        netflix_data,
+    )
+    general_information = time_stage(
+        timings,
+        'movie_and_series_information',
+        movies_and_series.movie_and_series_information,
+        netflix_data,
+    )
+    time_stage(
+        timings,
+        'movie_and_series_information_by_profile',
+        movies_and_series.movie_and_series_information_by_profile,
+        netflix_data,
+    )
+    check_chunked_process(
+        timings,
+        zip_path,
+        os.path.join(work_path, f'chunked_{rows}'),
+        chunksize=max(rows // TOTAL_CHUNKS, 1),
+    )
+    check_incremental_process(
+        timings, zip_path, os.path.join(work_path, f'incremental_{rows}')
+    )
+    if not visualizations:
+        return timings
+
+    colormap = create_visualizations.initialize_configuration()
+    create_visualizations.initialize_render_worker()
+    daily_data = time_stage(
+        timings,
+        'get_daily_data',
+        get_daily_data,
+        get_duration_in_hours(netflix_data),
+    )
+    series_data = general_information[3].sort_values(
+        'total_duration_hours', ascending=False
+    ).iloc[:30]
+    for stage_name, function, args, function_kwargs in [
+        (
+            'get_stacked_profile_duration',
+            create_visualizations.get_stacked_profile_duration,
+            (daily_data, image_path, colormap),
+            {},
+        ),
+        (
+            'get_stacked_profile_proportion',
+            create_visualizations.get_stacked_profile_proportion,
+            (daily_data, image_path, colormap),
+            {},
+        ),
+        (
+            'generate_calendarlike_plot',
+            create_visualizations.generate_calendarlike_plot,
+            (daily_data, image_path, colormap),
+            {},
+        ),
+        (
+            'animate_total_time',
+            create_visualizations.animate_total_time,
+            (daily_data, colormap, image_path),
+            {},
+        ),
+        (
+            'plot_series_time',
+            series_data.apply,
+            (create_visualizations.plot_series_time,),
+            {'image_path': image_path, 'cmap': colormap, 'axis': 1},
+        ),
+    ]:
+        time_stage(timings, stage_name, function, *args, **function_kwargs)
+    return timings
+
+
+def get_environment():
+    """
+    Get a description of the environment where the benchmarks ran, the
+     timings are only comparable within the same environment.
+
+    Returns
+    -------
+    environment: dict
+        Python, pandas and platform versions and number of cores.
+    """
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compares the timings of a run with the ones of a baseline.
+
+    Parameters
+    ----------
+    results: dict
+        Timings of each number of rows and stage (as saved by
+         run_benchmarks).
+    baseline: dict
+        Baseline timings with the same structure.
+    tolerance: float
+        Allowed relative increase of the time of a stage.
+
+    Returns
+    -------
+    regressions: list
+        Descriptions of the stages that are slower than the baseline or that
+         are not in it (so new stages are not left out of the comparison).
+    """
+    regressions = []
+    for rows, timings in results['results'].items():
+        baseline_timings = baseline['results'].get(rows, {})
+        for stage_name, seconds in timings.items():
+            if stage_name not in baseline_timings:
+                regressions.append(
+                    f'{stage_name} with {rows} rows: {seconds} seconds '
+                    f'(not in the baseline).'
+                )
+                continue
+            baseline_seconds = baseline_timings[stage_name]
+            slower = seconds - baseline_seconds
+            if (
+                slower > MIN_REGRESSION_SECONDS
+                and seconds > baseline_seconds * (1 + tolerance)
+            ):
+                regressions.append(
+                    f'{stage_name} with {rows} rows: {seconds} seconds '
+                    f'(baseline: {baseline_seconds} seconds).'
+                )
+    return regressions
+
+
+def run_benchmarks(sizes=None, output_path=None, baseline_path=None,
+                   tolerance=DEFAULT_TOLERANCE, visualizations=True,
+                   **kwargs):
+    """
+    Runs the benchmarks for each number of rows, saves the timings in a json
+     file and compares them with a baseline.
+
+    Parameters
+    ----------
+    sizes: list
+        Number of rows of each benchmark.
+    output_path: str
+        Path of the json file with the timings (not saved if not given).
+    baseline_path: str
+        Path of a json file with baseline timings (not compared if not
+         given).
+    tolerance: float
+        Allowed relative increase of the time of a stage.
+    visualizations: bool
+        If True each visualization is timed too.
+    kwargs:
+        Other parameters of generate_viewing_activity.
+
+    Returns
+    -------
+    regressions: list
+        Descriptions of the stages that are slower than the baseline or that
+         are not in it.
+    """
+    results = {'environment': get_environment(), 'results': {}}
+    with tempfile.TemporaryDirectory() as work_path:
+        for rows in sizes or DEFAULT_SIZES:
+            results['results'][str(rows)] = benchmark_size(
+                rows, work_path, visualizations=visualizations, **kwargs
+            )
+    if output_path:
+        with open(output_path, 'w') as output_file:
+            json.dump(results, output_file, indent=4)
+        logging.info(f'Benchmark results saved into {output_path}.')
+    regressions = []
+    if baseline_path:
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_results(results, baseline, tolerance)
+        for regression in regressions:
+            logging.warning(f'Regression: {regression}')
+        logging.info(f'Found {len(regressions)} regressions.')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time the pipeline stages with synthetic data.'
+    )
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=DEFAULT_SIZES,
+        help='Number of rows of each benchmark.',
+    )
+    parser.add_argument('--profiles', type=int, default=3)
+    parser.add_argument('--series-ratio', type=float, default=0.6)
+    parser.add_argument('--autoplay-ratio', type=float, default=0.1)
+    parser.add_argument('--supplemental-ratio', type=float, default=0.05)
+    parser.add_argument(
+        '--output', help='Json file where the timings are saved.'
+    )
+    parser.add_argument(
+        '--baseline', help='Json file with the timings to compare with.'
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help='Allowed relative increase of the time of a stage.',
+    )
+    parser.add_argument(
+        '--skip-visualizations',
+        action='store_true',
+        help='Only time the data stages.',
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    found_regressions = run_benchmarks(
+        sizes=args.sizes,
+        output_path=args.output,
+        baseline_path=args.baseline,
+        tolerance=args.tolerance,
+        visualizations=not args.skip_visualizations,
+        profiles=args.profiles,
+        series_ratio=args.series_ratio,
+        autoplay_ratio=args.autoplay_ratio,
+        supplemental_ratio=args.supplemental_ratio,
+    )
+    sys.exit(1 if found_regressions else 0)
@@ -1,26 +1,232 @@
+import argparse
+import logging
 import os
 
+from src import instrumentation
+from src.data import initial_data_unzip_extraction, movies_and_series
+from src.visualization import create_visualizations
+
+
+METRICS_PATH = os.path.join(
+    os.path.dirname(__file__), 'reports', 'pipeline_metrics.json'
+)
+# The verbose mode logs the per-chunk steps, the spans and samples of the
+# rejected values; the aggregated counters are always in the metrics.
+VERBOSITY_LEVELS = {
+    'quiet': logging.WARNING,
+    'normal': logging.INFO,
+    'verbose': logging.DEBUG,
+}
 
 pipeline = [
-    'data/initial_data_unzip_extraction',
-    'data/movies_and_series',
-    'visualization/create_visualizations',
+    ('data/initial_data_unzip_extraction', initial_data_unzip_extraction),
+    ('data/movies_and_series', movies_and_series),
+    ('visualization/create_visualizations', create_visualizations),
 ]
 
 
-def run_pipeline():
+def run_stage(stage_name, stage_module, stage_inputs):
+    """
+    Runs the process function of a stage with the outputs of the previous
+     stage.
+
+    Parameters
+    ----------
+    stage_name: str
+        Name of the stage (used for the logs).
+    stage_module: module
+        Module with a process function.
+    stage_inputs: dict
+        Keyword arguments given to the process function.
+
+    Returns
+    -------
+    stage_outputs: dict
+        The outputs of the process function (an empty dict if it returns
+         nothing).
+    stage_stats: dict
+        Wall time (seconds) and peak memory (MB) of the stage (see
+         instrumentation.stage).
     """
-    Function that finds the most relevant python commands and runs them.
+    logging.info(f'Running stage {stage_name}.')
+    with instrumentation.stage(stage_name) as stage_stats:
+        try:
+            stage_outputs = stage_module.process(**stage_inputs) or {}
+        except Exception:
+            logging.exception(f'Stage {stage_name} failed, stopping pipeline.')
+            raise
+    return stage_outputs, stage_stats
+
+
+def run_pipeline(force=False, incremental=False, workers=1, profile=False,
+                 trace_memory=False, metrics_path=METRICS_PATH,
+                 zip_path=None, extract=(), interim_data_path=None,
+                 report_path=None, save_figures=True, chunksize=None):
+    """
+    Function that runs the process of every stage of the pipeline in the
+     same python process. The outputs of each stage are given directly to the
+     next one, so the data does not have to be read again from disk. If a
+     stage fails the pipeline stops.
+
+    Each stage skips itself when its inputs did not change since its last
+     run (see src.data.stage_cache), so only the stages downstream of a
+     change are executed again.
+
+    Parameters
+    ----------
+    force: bool
+        If True every stage runs even if it is cached.
+    incremental: bool
+        If True the netflix data is ingested incrementally (see
+         movies_and_series.process).
+    workers: int
+        Number of processes used to render the figures (see
+         create_visualizations.render_figures).
+    profile: bool
+        If True each stage runs under cProfile (see instrumentation.stage).
+    trace_memory: bool
+        If True each stage runs under tracemalloc (see
+         instrumentation.stage).
+    metrics_path: str
+        Path of the json file with the metrics of the run: the metrics of
+         each stage and the aggregated metrics of each span.
+    zip_path: str
+        Path of the zip file given by netflix (see
+         initial_data_unzip_extraction.process).
+    extract: list
+        Patterns of the files of the zip file that are extracted into disk.
+         The netflix data is read directly from the zip file, so nothing has
+         to be extracted.
+    interim_data_path: str
+        Folder of the interim data and of the fingerprints of the stages,
+         data/interim by default.
+    report_path: str
+        Folder of the figures and the report, reports by default.
+    save_figures: bool
+        If True every figure of the report is also saved in its own file (see
+         create_visualizations.process).
+    chunksize: int
+        If given, the netflix data is processed in chunks of this number of
+         rows, so it does not have to fit in memory (see
+         movies_and_series.process).
+
     Returns
     -------
-    None
+    pipeline_stats: list
+        Wall time and peak memory of each stage.
     """
-    general_path = os.path.join(os.path.dirname(__file__), 'src')
-    for script_name in pipeline:
-        script = os.path.join(general_path, f'{script_name}.py')
-        command = f'python {script}'
-        os.system(command)
+    instrumentation.configure(profile=profile, trace_memory=trace_memory)
+    stage_params = {
+        'data/initial_data_unzip_extraction': {
+            'zip_path': zip_path,
+            'members': extract,
+            'interim_data_path': interim_data_path,
+        },
+        'data/movies_and_series': {
+            'incremental': incremental,
+            'chunksize': chunksize,
+            'interim_data_path': interim_data_path,
+        },
+        'visualization/create_visualizations': {
+            'workers': workers,
+            'interim_data_path': interim_data_path,
+            'report_path': report_path,
+            'save_figures': save_figures,
+        },
+    }
+    stage_outputs = {}
+    pipeline_stats = []
+    for stage_name, stage_module in pipeline:
+        stage_inputs = dict(
+            stage_outputs, force=force, **stage_params.get(stage_name, {})
+        )
+        stage_outputs, stage_stats = run_stage(
+            stage_name, stage_module, stage_inputs
+        )
+        pipeline_stats.append(stage_stats)
+    summary = instrumentation.save_summary(metrics_path)
+    logging.info(f'Pipeline took {summary["total_time"]:.2f} seconds.')
+    return pipeline_stats
 
 
 if __name__ == '__main__':
-    run_pipeline()
+    parser = argparse.ArgumentParser(description='Run the netflix pipeline.')
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Run every stage even if its inputs did not change.',
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only ingest the rows that are newer than the last ingestion.',
+    )
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        help='Process the netflix data in chunks of this number of rows.',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Processes used to render the figures (0 uses every core).',
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Run each stage under cProfile and report its slowest functions.',
+    )
+    parser.add_argument(
+        '--trace-memory',
+        action='store_true',
+        help='Run each stage under tracemalloc and report its allocations.',
+    )
+    parser.add_argument(
+        '--metrics-path',
+        default=METRICS_PATH,
+        help='Json file where the metrics of the run are saved.',
+    )
+    parser.add_argument(
+        '--zip-path',
+        help='Zip file given by netflix (data/raw/netflix-report.zip).',
+    )
+    parser.add_argument(
+        '--extract',
+        nargs='+',
+        default=[],
+        metavar='PATTERN',
+        help='Files of the zip file to extract into data/raw/netflix-report '
+             "(the data is read from the zip file, use '*' for everything).",
+    )
+    parser.add_argument(
+        '--no-figure-files',
+        dest='save_figures',
+        action='store_false',
+        help='Only save the report, not a pdf file per figure.',
+    )
+    parser.add_argument(
+        '--verbosity',
+        choices=list(VERBOSITY_LEVELS),
+        default='normal',
+        help='Amount of logs (verbose adds per-chunk and sampled logs).',
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=VERBOSITY_LEVELS[args.verbosity])
+    # The debug logs of the plotting libraries are not useful here.
+    for library in ['matplotlib', 'PIL']:
+        logging.getLogger(library).setLevel(
+            max(VERBOSITY_LEVELS[args.verbosity], logging.INFO)
+        )
+    run_pipeline(
+        force=args.force,
+        incremental=args.incremental,
+        chunksize=args.chunksize,
+        workers=args.workers,
+        profile=args.profile,
+        trace_memory=args.trace_memory,
+        metrics_path=args.metrics_path,
+        zip_path=args.zip_path,
+        extract=args.extract,
+        save_figures=args.save_figures,
+    )
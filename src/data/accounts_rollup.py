@@ -0,0 +1,155 @@
+import logging
+import os
+import pandas as pd
+
+from src.data.fetch_information import read_interim_data
+from src.data.movies_and_series import INTERIM_FORMAT, save_data
+from src.instrumentation import instrumented
+
+
+ACCOUNT_COLUMN = 'account'
+MOVIE_ROLLUP_COLUMNS = [
+    'title',
+    'individual_start',
+    'total_duration_seen',
+]
+SERIES_ROLLUP_COLUMNS = [
+    'new_title',
+    'min_start_time',
+    'max_end_time',
+    'total_duration_hours',
+    'different_chapters_seen',
+]
+
+
+def get_accounts_information(interim_data_paths, name, columns):
+    """
+    Get the same summary of every account in a single dataframe, with a
+     column that identifies the account of each row.
+
+    Parameters
+    ----------
+    interim_data_paths: dict
+        Mapping from the name of each account to the folder of its interim
+         data.
+    name: str
+        Name of the summary file (for example general_movie_info).
+    columns: list
+        Columns of the summary that are read.
+
+    Returns
+    -------
+    accounts_information: pd.DataFrame
+        Summaries of all the accounts.
+
+    """
+    accounts_information = []
+    for account, interim_data_path in interim_data_paths.items():
+        information = read_interim_data(
+            os.path.join(interim_data_path, f'{name}.{INTERIM_FORMAT}'),
+            columns=columns,
+        )
+        information.insert(0, ACCOUNT_COLUMN, account)
+        accounts_information.append(information)
+    if not accounts_information:
+        return pd.DataFrame(columns=[ACCOUNT_COLUMN] + columns)
+    accounts_information = pd.concat(accounts_information, ignore_index=True)
+    accounts_information[ACCOUNT_COLUMN] = \
+        accounts_information[ACCOUNT_COLUMN].astype('category')
+    return accounts_information
+
+
+@instrumented
+def rollup_movies(movie_info):
+    """
+    Summarises the movies of all the accounts into one row per movie.
+
+    Parameters
+    ----------
+    movie_info: pd.DataFrame
+        Movie summaries of all the accounts (see get_accounts_information).
+
+    Returns
+    -------
+    movie_rollup: pd.DataFrame
+        Number of accounts that watched each movie, total number of
+         individual starts and total and mean (by account) minutes seen.
+
+    """
+    movie_rollup = movie_info.groupby('title', observed=True).agg(
+        accounts=(ACCOUNT_COLUMN, 'nunique'),
+        individual_start=('individual_start', 'sum'),
+        total_duration_seen=('total_duration_seen', 'sum'),
+        mean_duration_seen=('total_duration_seen', 'mean'),
+    ).sort_index().reset_index()
+    return movie_rollup
+
+
+@instrumented
+def rollup_series(series_info):
+    """
+    Summarises the series of all the accounts into one row per series.
+
+    Parameters
+    ----------
+    series_info: pd.DataFrame
+        Series summaries of all the accounts (see get_accounts_information).
+
+    Returns
+    -------
+    series_rollup: pd.DataFrame
+        Number of accounts that watched each series, first and last time it
+         was watched, total and mean (by account) hours seen and the maximum
+         number of chapters seen by an account.
+
+    """
+    series_rollup = series_info.groupby('new_title', observed=True).agg(
+        accounts=(ACCOUNT_COLUMN, 'nunique'),
+        min_start_time=('min_start_time', 'min'),
+        max_end_time=('max_end_time', 'max'),
+        total_duration_hours=('total_duration_hours', 'sum'),
+        mean_duration_hours=('total_duration_hours', 'mean'),
+        max_different_chapters_seen=('different_chapters_seen', 'max'),
+    ).sort_index().reset_index()
+    return series_rollup
+
+
+@instrumented
+def process(interim_data_paths, output_path):
+    """
+    Main process function. Rolls up the general movie and series summaries
+     of several accounts (see batch_flow.py) and saves, in output_path, the
+     summaries of all the accounts together (accounts_movie_info and
+     accounts_series_info) and their rollups (movie_rollup and
+     series_rollup).
+
+    Parameters
+    ----------
+    interim_data_paths: dict
+        Mapping from the name of each account to the folder of its interim
+         data.
+    output_path: str
+        Folder where the rollups are saved.
+
+    Returns
+    -------
+    outputs: dict
+        The saved dataframes by name.
+    """
+    logging.info(f'Rolling up {len(interim_data_paths)} accounts.')
+    os.makedirs(output_path, exist_ok=True)
+    movie_info = get_accounts_information(
+        interim_data_paths, 'general_movie_info', MOVIE_ROLLUP_COLUMNS
+    )
+    series_info = get_accounts_information(
+        interim_data_paths, 'general_series_info', SERIES_ROLLUP_COLUMNS
+    )
+    outputs = {
+        'accounts_movie_info': movie_info,
+        'accounts_series_info': series_info,
+        'movie_rollup': rollup_movies(movie_info),
+        'series_rollup': rollup_series(series_info),
+    }
+    for name, data in outputs.items():
+        save_data(data=data, path=output_path, name=name)
+    return outputs
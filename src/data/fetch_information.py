@@ -1,11 +1,43 @@
 import pandas as pd
 import logging
 
+from src.data.schema import INTERIM_SCHEMA, read_csv
+
 
 SECONDS_IN_HOUR = 3600
 
 
-def get_processed_netflix_data(data_path):
+def read_interim_data(data_path, columns=None, schema=None):
+    """
+    Read an interim file saved by the data process. Parquet files keep their
+     datetime and list columns typed; csv files (written by previous versions
+     of the process) are still supported.
+
+    Parameters
+    ----------
+    data_path: str
+        Location of the interest interim data.
+    columns: list
+        Columns to read, if not given all of them are read.
+    schema: dict
+        Types of the columns (see src.data.schema), used to read csv files.
+
+    Returns
+    -------
+    data: pd.DataFrame
+        DataFrame with the interim information.
+
+    """
+    if data_path.endswith('.csv'):
+        logging.info(f'Reading csv data from {data_path}.')
+        if schema is not None:
+            return read_csv(data_path, schema, columns=columns)
+        return pd.read_csv(data_path, usecols=columns)
+    logging.info(f'Reading parquet data from {data_path}.')
+    return pd.read_parquet(data_path, columns=columns)
+
+
+def get_processed_netflix_data(data_path, columns=None):
     """
     Get the processed netflix data
 
@@ -13,6 +45,8 @@ def get_processed_netflix_data(data_path):
     ----------
     data_path: str
         location of the interest netflix processed data.
+    columns: list
+        Columns to read, if not given all of them are read.
 
     Returns
     -------
@@ -21,19 +55,38 @@ def get_processed_netflix_data(data_path):
 
     """
     logging.info('Reading netflix processed data.')
-    netflix_data = pd.read_csv(data_path)
-    logging.info('Making start_time into datetime.')
-    netflix_data.start_time = pd.to_datetime(netflix_data.start_time)
-    logging.info('Making end_time into datetime.')
-    netflix_data.end_time = pd.to_datetime(netflix_data.end_time)
+    netflix_data = read_interim_data(
+        data_path, columns=columns, schema=INTERIM_SCHEMA
+    )
+    return get_duration_in_hours(netflix_data)
+
+
+def get_duration_in_hours(netflix_data):
+    """
+    Get a copy of the processed netflix data with the duration in hours
+     instead of seconds.
+
+    Parameters
+    ----------
+    netflix_data: pd.DataFrame
+        A data frame with the processed netflix information.
+
+    Returns
+    -------
+    netflix_data: pd.DataFrame
+        The same information with the duration given in hours.
+
+    """
     logging.info('Dividing duration seconds over 3600 to get hours.')
-    netflix_data.duration = netflix_data.duration/SECONDS_IN_HOUR
-    return netflix_data
+    return netflix_data.assign(
+        duration=netflix_data.duration/SECONDS_IN_HOUR
+    )
 
 
-def get_general_sorted_data(data_path, sorted_by='', limit_rows=0):
+def get_general_sorted_data(data_path, sorted_by='', limit_rows=0,
+                            columns=None):
     """
-    Get a general DataFrame from a CSV (sorted and limited by rows)
+    Get a general DataFrame from an interim file (sorted and limited by rows)
 
     Parameters
     ----------
@@ -43,6 +96,8 @@ def get_general_sorted_data(data_path, sorted_by='', limit_rows=0):
         String indicating if data must be sorted somehow in descending order.
     limit_rows: int
         Number of rows that should be shown.
+    columns: list
+        Columns to read, if not given all of them are read.
 
     Returns
     -------
@@ -51,7 +106,29 @@ def get_general_sorted_data(data_path, sorted_by='', limit_rows=0):
 
     """
     logging.info(f'Reading processed data from {data_path}.')
-    data = pd.read_csv(data_path)
+    data = read_interim_data(data_path, columns=columns)
+    return sort_and_limit_data(data, sorted_by, limit_rows)
+
+
+def sort_and_limit_data(data, sorted_by='', limit_rows=0):
+    """
+    Sort a DataFrame in descending order and limit its number of rows.
+
+    Parameters
+    ----------
+    data: pd.DataFrame
+        DataFrame with the interest information.
+    sorted_by: str
+        String indicating if data must be sorted somehow in descending order.
+    limit_rows: int
+        Number of rows that should be shown.
+
+    Returns
+    -------
+    data: pd.DataFrame
+        DataFrame with the desired information.
+
+    """
     if sorted_by:
         logging.info(f'Data is sorted by {sorted_by}.')
         data = data.sort_values(sorted_by, ascending=False)
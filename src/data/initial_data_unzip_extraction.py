@@ -1,11 +1,25 @@
+import fnmatch
 import logging
 import os
 
-from zipfile import ZipFile
-from time import perf_counter
+from contextlib import contextmanager
+from zipfile import ZipFile, is_zipfile
 
+from src.data.stage_cache import (
+    get_file_fingerprint,
+    get_stage_fingerprint,
+    is_stage_cached,
+    save_stage_fingerprint,
+)
+from src.instrumentation import instrumented
 
-def extract_zip_files(file, extract_to):
+
+STAGE_NAME = 'initial_data_unzip_extraction'
+VIEWING_ACTIVITY_MEMBER = 'CONTENT_INTERACTION/ViewingActivity.csv'
+
+
+@instrumented
+def extract_zip_files(file, extract_to, members=None):
     """
     Helper function to extract zip files from one zip folder into another
      folder.
@@ -17,27 +31,155 @@ def extract_zip_files(file, extract_to):
     extract_to:
         String of the path containing the new directory where all the
          extraction will be saved in.
+    members: list
+        Patterns (as in fnmatch) of the files to extract, if not given every
+         file is extracted.
 
     Returns
     -------
-    None
+    extracted: list
+        Names of the extracted files.
     """
-    tick = perf_counter()
     logging.info('Extracting files.')
     with ZipFile(file, 'r') as zip_f:
-        zip_f.extractall(extract_to)
-    tock = perf_counter()
-    time_it_took = tock - tick
-    logging.info(f'Extracting files took {time_it_took} seconds.')
-    return None
+        extracted = [
+            name for name in zip_f.namelist()
+            if members is None or any(
+                fnmatch.fnmatch(name, pattern) for pattern in members
+            )
+        ]
+        zip_f.extractall(extract_to, members=extracted)
+    logging.info(f'Extracted {len(extracted)} files into {extract_to}.')
+    return extracted
+
+
+def get_zip_member(zip_file, member=VIEWING_ACTIVITY_MEMBER):
+    """
+    Get the information of a file inside a zip file. Besides its exact name,
+     the file can be inside a parent folder of the zip file.
+
+    Parameters
+    ----------
+    zip_file: ZipFile
+        Opened zip file.
+    member: str
+        Path of the file inside the zip file.
+
+    Returns
+    -------
+    member_info: ZipInfo
+        Information of the file.
+    """
+    for member_info in zip_file.infolist():
+        name = member_info.filename
+        if name == member or name.endswith(f'/{member}'):
+            return member_info
+    raise KeyError(f'There is no {member} in {zip_file.filename}.')
+
+
+@contextmanager
+def open_raw_data(data_path, member=VIEWING_ACTIVITY_MEMBER):
+    """
+    Opens the raw netflix data. If data_path is a zip file (the netflix
+     export) the member is decompressed while it is read, so nothing has to
+     be extracted into disk. Otherwise data_path is opened as it is.
 
+    Parameters
+    ----------
+    data_path: str
+        Path of the zip file or of the extracted file.
+    member: str
+        Path of the file inside the zip file.
+
+    Yields
+    ------
+    raw_file: file object
+        Binary file that can be given to pd.read_csv.
+    """
+    if not is_zipfile(data_path):
+        with open(data_path, 'rb') as raw_file:
+            yield raw_file
+        return
+    with ZipFile(data_path, 'r') as zip_f:
+        with zip_f.open(get_zip_member(zip_f, member)) as raw_file:
+            yield raw_file
 
-def process():
+
+def get_raw_data_fingerprint(data_path, member=VIEWING_ACTIVITY_MEMBER):
+    """
+    Get a fingerprint of the raw netflix data. For zip files only the member
+     that is read is taken into account (with the checksum and size saved in
+     the zip file, so it does not have to be decompressed).
+
+    Parameters
+    ----------
+    data_path: str
+        Path of the zip file or of the extracted file.
+    member: str
+        Path of the file inside the zip file.
+
+    Returns
+    -------
+    fingerprint: str
+        Fingerprint of the raw data.
+    """
+    if not is_zipfile(data_path):
+        return get_file_fingerprint(data_path)
+    with ZipFile(data_path, 'r') as zip_f:
+        member_info = get_zip_member(zip_f, member)
+    return f'{member_info.filename}:{member_info.CRC}:{member_info.file_size}'
+
+
+def process(zip_path=None, extract_to=None, members=(),
+            interim_data_path=None, force=False):
+    """
+    Main process function. The netflix data is read directly from the zip
+     file by the next stages, so by default nothing is extracted. Only the
+     files that match the given patterns are extracted, and the extraction
+     is skipped if the zip file did not change since the last time.
+
+    Parameters
+    ----------
+    zip_path: str
+        Path of the zip file, data/raw/netflix-report.zip by default.
+    extract_to: str
+        Folder where the files are extracted, data/raw/netflix-report by
+         default.
+    members: list
+        Patterns (as in fnmatch) of the files to extract ('*' extracts
+         everything).
+    interim_data_path: str
+        Folder of the interim data, where the fingerprint of the stage is
+         saved, data/interim by default.
+    force: bool
+        If True the extraction is done even if it is cached.
+
+    Returns
+    -------
+    outputs: dict
+        The path of the raw netflix data (the zip file), so it can be given
+         to the next stage.
+    """
     general_path = os.path.join(os.path.dirname(__file__), '..', '..')
     raw_data_path = os.path.join(general_path, 'data/raw')
-    file_name_path = os.path.join(raw_data_path, 'netflix-report.zip')
-    new_folder_path = os.path.join(raw_data_path, 'netflix-report')
-    extract_zip_files(file=file_name_path, extract_to=new_folder_path)
+    interim_data_path = interim_data_path or os.path.join(
+        general_path, 'data/interim'
+    )
+    cache_path = os.path.join(interim_data_path, 'stage_cache')
+    zip_path = zip_path or os.path.join(raw_data_path, 'netflix-report.zip')
+    extract_to = extract_to or os.path.join(raw_data_path, 'netflix-report')
+    outputs = {'data_path': zip_path}
+    if not members:
+        return outputs
+    fingerprint = get_stage_fingerprint(
+        inputs=[zip_path, __file__],
+        params={'extract_to': extract_to, 'members': sorted(members)},
+    )
+    if not force and is_stage_cached(STAGE_NAME, fingerprint, cache_path):
+        return outputs
+    extract_zip_files(file=zip_path, extract_to=extract_to, members=members)
+    save_stage_fingerprint(STAGE_NAME, fingerprint, [extract_to], cache_path)
+    return outputs
 
 
 if __name__ == "__main__":
@@ -1,267 +1,1538 @@
 import datetime
+import hashlib
+import json
 import logging
+import numpy as np
 import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import re
+import tempfile
+
+from functools import lru_cache
+
+from src.data import (
+    fetch_information,
+    initial_data_unzip_extraction,
+    schema,
+)
+from src.data.fetch_information import read_interim_data
+from src.data.initial_data_unzip_extraction import (
+    get_raw_data_fingerprint,
+    open_raw_data,
+)
+from src.data.schema import (
+    DATETIME_FORMAT,
+    RAW_SCHEMA,
+    read_csv,
+    read_csv_chunks,
+)
+from src.data.stage_cache import (
+    get_stage_fingerprint,
+    is_stage_cached,
+    save_stage_fingerprint,
+)
+from src.instrumentation import count, instrumented, log_sample
+
+
+CHUNKSIZE = 100000
+INTERIM_FORMAT = 'parquet'
+SECONDS_IN_HOUR = 3600
+MOVIE_SUMMARISED_COLUMNS = [
+    'start_time',
+    'end_time',
+    'duration',
+    'bookmark',
+    'latest_bookmark',
+    'profile_name',
+    'is_serie',
+]
+SERIES_INFORMATION_COLUMNS = [
+    'new_title',
+    'min_start_time',
+    'max_end_time',
+    'chapters_titles',
+    'all_start_times',
+    'all_end_times',
+    'all_start_time_hours',
+    'total_duration_hours',
+    'total_lapsed_hours',
+    'effective_seen_time',
+    'different_chapters_seen',
+    'effective_seen_time_in_different_chapters',
+    'chapter_speed',
+    'waiting_time_mean',
+    'waiting_time_median',
+    'waiting_time_std',
+    'waiting_time_max',
+    'waiting_time_min',
+]
+STAGE_NAME = 'movies_and_series'
+# Columns whose values repeat a lot, they are stored as categoricals.
+CATEGORICAL_COLUMNS = [
+    'profile_name',
+    'title',
+    'new_title',
+    'device_type',
+    'country',
+]
+# Markers that netflix adds to the titles of series, by locale (new locales
+# can be added with register_series_traits).
+SERIES_TRAITS = {
+    'en': [
+        ": Season",
+        ": Book",
+        "(Episode ",
+        " : Episode ",
+        " : Part ",
+        "(Chapter ",
+        " : Chapter ",
+    ],
+    'es': [
+        ": Temporada",
+        ": Libro",
+        "(Capítulo ",
+        " : Capítulo ",
+        " : Parte ",
+        " : Episodio ",
+        "(Episodio ",
+    ],
+}
+
+
+@instrumented
+def process_netflix_data(df, profiles_dict=None):
+    """
+    This function makes a transformation of the raw data given by netflix by
+    applying certain relevant steps:
+        1) Transformation of column names (makes easier the manipulation for
+            further dataframe operations).
+        2) Anonymize the profiles (relevant if personal information is a deal).
+        3) Transform object of dates into real datetime objects.
+        4) Transform object of duration into a float value.
+        5) Generate additional columns: end_time, new_title
+        6) Drop non-used columns.
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        The raw data given by netflix.
+    profiles_dict: dict
+        Mapping from the original profile name to the anonymized one. If it is
+         not given it is obtained from df (when df is just a chunk of the data
+         it must be given, see get_profiles_dict_from_chunks).
+
+    Returns
+    -------
+    netflix_data: pd.DataFrame
+        Processed netflix data.
+
+    """
+    # Transform columns for an easier manipulation
+    df = normalize_column_names(df)
+
+    # Transform star_time into a datetime (the readers of src.data.schema
+    # already parse it)
+    df.start_time = pd.to_datetime(df.start_time, format=DATETIME_FORMAT)
+    df.start_time = df.start_time  # - datetime.timedelta(hours=6)
+
+    # Anonymize the different profiles
+    if profiles_dict is None:
+        profiles_dict = get_profiles_dict(
+            df.groupby('profile_name', observed=True).start_time.min()
+        )
+    # These steps run for every chunk of the data, so they only log in the
+    # verbose mode.
+    logging.debug('Renaming profile_name: %s.', profiles_dict)
+    df.profile_name = df.profile_name.map(profiles_dict)
+
+    played_by_profile = (
+        df.attributes.isna() & df.supplemental_video_type.isna()
+    )
+    count('rows_not_played_by_profile', (~played_by_profile).sum())
+    non_used_cols = ['attributes', 'supplemental_video_type']
+    logging.debug('Removing non_used_columns: %s.', non_used_cols)
+    netflix_data = df.loc[played_by_profile].drop(non_used_cols, axis=1)
+
+    netflix_data.duration = get_duration_seconds(netflix_data.duration)
+    rejected_rows = netflix_data.duration.isna()
+    if rejected_rows.any():
+        count('rows_with_malformed_duration', rejected_rows.sum())
+        logging.warning(
+            f'Rejecting {rejected_rows.sum()} rows with malformed duration.'
+        )
+        netflix_data = netflix_data[~rejected_rows].copy()
+    netflix_data['end_time'] = netflix_data.start_time + pd.to_timedelta(
+        netflix_data.duration, unit='s'
+    )
+    netflix_data['title'] = netflix_data.title.astype('category')
+    netflix_data['new_title'] = get_new_title(netflix_data.title)
+    return set_categorical_columns(netflix_data)
+
+
+def get_new_title(title):
+    """
+    Get the title of the series of each row (the part of the title before the
+     first ':'). It is computed once for each unique title and broadcast back
+     to the rows.
+
+    Parameters
+    ----------
+    title: pd.Series
+        Categorical series with the titles.
+
+    Returns
+    -------
+    new_title: pd.Series
+        Categorical series with the new titles.
+
+    """
+    title_categories = title.cat.categories.to_series().str.split(':').str[0]
+    new_title_codes, new_title_categories = pd.factorize(
+        title_categories, sort=True
+    )
+    # Missing titles (code -1) keep a missing new title.
+    new_title_codes = np.append(new_title_codes, -1)[title.cat.codes]
+    new_title = pd.Categorical.from_codes(
+        new_title_codes, categories=new_title_categories
+    )
+    return pd.Series(new_title, index=title.index)
+
+
+def set_categorical_columns(netflix_data):
+    """
+    Stores the columns whose values repeat a lot (CATEGORICAL_COLUMNS) as
+     categoricals, which use less memory and make groupby operations faster.
+
+    Parameters
+    ----------
+    netflix_data: pd.DataFrame
+        Processed netflix data.
+
+    Returns
+    -------
+    netflix_data: pd.DataFrame
+        The same data with categorical columns.
+
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col not in netflix_data:
+            continue
+        if not isinstance(netflix_data[col].dtype, pd.CategoricalDtype):
+            netflix_data[col] = netflix_data[col].astype('category')
+        categories = netflix_data[col].cat.categories
+        if not categories.is_monotonic_increasing:
+            # Sorting by the column must sort it alphabetically (the
+            # categories of data read by chunks keep their reading order).
+            netflix_data[col] = netflix_data[col].cat.reorder_categories(
+                categories.sort_values()
+            )
+    return netflix_data
+
+
+def normalize_column_names(df):
+    """
+    Transforms the column names of the raw netflix data into lower case snake
+     case names (makes easier the manipulation for further dataframe
+     operations).
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        The raw data given by netflix.
+
+    Returns
+    -------
+    df: pd.DataFrame
+        The same data with the renamed columns.
+
+    """
+    new_columns = {
+        col: col.lower().strip().replace(' ', '_')
+        for col in df.columns
+    }
+    logging.debug('Renaming columns: %s.', new_columns)
+    return df.rename(columns=new_columns)
+
+
+def get_profiles_dict(profiles_first_start):
+    """
+    Anonymizes the different profiles: the profile that was used first is
+     profile_0, the next one profile_1 and so on.
+
+    Parameters
+    ----------
+    profiles_first_start: pd.Series
+        Series indexed by profile_name with the first start_time of each
+         profile.
+
+    Returns
+    -------
+    profiles_dict: dict
+        Mapping from the original profile name to the anonymized one.
+
+    """
+    profiles_dict = {
+        profile_name: f'profile_{num}'
+        for num, profile_name
+        in enumerate(profiles_first_start.sort_values().index)
+    }
+    return profiles_dict
+
+
+def get_duration_timedelta(string_time=None, time_format="%H:%M:%S"):
+    """
+    This is a function to obtain a string that indicates duration as hh:mm:ss
+     to an actual timedelta value.
+
+    Parameters
+    ----------
+    string_time: str
+        String that indicates a duration.
+    time_format:
+        Format in which the string is given. It will be by default "%H:%M:%S".
+
+    Returns
+    -------
+    timedelta: datetime.timedelta
+        converts the given duration to a time delta so it can be used in
+        different datetime operations.
+
+    """
+    strptime = datetime.datetime.strptime(string_time, time_format).time()
+    timedelta = datetime.timedelta(
+        hours=strptime.hour,
+        minutes=strptime.minute,
+        seconds=strptime.second,
+        microseconds=strptime.microsecond,
+    )
+    return timedelta
+
+
+def get_duration_seconds(duration, time_format="%H:%M:%S"):
+    """
+    This is a function to obtain, for a whole column at once, the number of
+     seconds of a string duration given as hh:mm:ss.
+    Rows that can not be parsed in a vectorized way are parsed again one by
+     one with get_duration_timedelta; if they still fail they are left as NaN.
+
+    Parameters
+    ----------
+    duration: pd.Series
+        Series of strings that indicate a duration.
+    time_format:
+        Format in which the malformed strings are tried again. It will be by
+         default "%H:%M:%S".
+
+    Returns
+    -------
+    seconds: pd.Series
+        Series with the duration in seconds (NaN for rejected rows).
+
+    """
+    seconds = pd.Series(
+        pd.to_timedelta(duration, errors='coerce').dt.total_seconds(),
+        index=duration.index,
+        copy=True,
+    )
+    malformed = seconds.isna() & duration.notna()
+    if malformed.any():
+        count('malformed_durations', malformed.sum())
+        log_sample('Parsing malformed durations one by one: %s', duration[
+            malformed
+        ])
+        seconds[malformed] = duration[malformed].apply(
+            get_duration_seconds_or_nan,
+            time_format=time_format,
+        )
+    return seconds
+
+
+def get_duration_seconds_or_nan(string_time, time_format="%H:%M:%S"):
+    """
+    Fallback of get_duration_seconds for a single value: it uses
+     get_duration_timedelta and returns NaN if the string can not be parsed.
+
+    Parameters
+    ----------
+    string_time: str
+        String that indicates a duration.
+    time_format:
+        Format in which the string is given. It will be by default "%H:%M:%S".
+
+    Returns
+    -------
+    seconds: float
+        Duration in seconds, NaN if the string is malformed.
+
+    """
+    try:
+        timedelta = get_duration_timedelta(string_time, time_format)
+    except (TypeError, ValueError):
+        return np.nan
+    return timedelta.total_seconds()
+
+
+@instrumented
+def get_netflix_data(data_path, profiles_dict=None):
+    """
+    Get the netflix data and process it.
+
+    Parameters
+    ----------
+    data_path: str
+        location of the interest netflix data that will be processed.
+    profiles_dict: dict
+        Mapping from the original profile name to the anonymized one. If it is
+         not given it is obtained from the data.
+
+    Returns
+    -------
+    netflix_data_with_series: pd.DataFrame
+        A data frame with the information of the processed netflix data.
+
+    """
+    logging.info('Getting the netflix information')
+    with open_raw_data(data_path) as raw_file:
+        netflix_data_all = read_csv(raw_file, RAW_SCHEMA)
+    processed_netflix_data = process_netflix_data(
+        netflix_data_all, profiles_dict
+    )
+    netflix_data_with_series = identify_series_in_data(processed_netflix_data)
+    return netflix_data_with_series
+
+
+@instrumented
+def get_profiles_dict_from_chunks(data_path, chunksize=CHUNKSIZE):
+    """
+    Obtains the anonymized profiles dictionary of a netflix data file by
+     reading it in chunks, only with the columns needed to do so.
+
+    Parameters
+    ----------
+    data_path: str
+        location of the interest netflix data that will be processed.
+    chunksize: int
+        Number of rows read at a time.
+
+    Returns
+    -------
+    profiles_dict: dict
+        Mapping from the original profile name to the anonymized one.
+
+    """
+    logging.info('Getting the profiles from the netflix information.')
+    profiles_first_start = pd.Series(dtype='datetime64[ns]')
+    with open_raw_data(data_path) as raw_file:
+        chunks = read_csv_chunks(
+            raw_file,
+            RAW_SCHEMA,
+            chunksize,
+            columns=['Profile Name', 'Start Time'],
+        )
+        for chunk in chunks:
+            chunk_first_start = chunk['Start Time'].groupby(
+                chunk['Profile Name'], observed=True
+            ).min()
+            profiles_first_start = pd.concat(
+                [profiles_first_start, chunk_first_start]
+            ).groupby(level=0).min()
+    return get_profiles_dict(profiles_first_start)
+
+
+@instrumented
+def stream_netflix_data(data_path, output_path, chunksize=CHUNKSIZE,
+                        profiles_dict=None):
+    """
+    Get the netflix data and process it in chunks of a bounded number of rows,
+     so the memory used does not depend on the size of the file. Each
+     processed chunk is appended to the output file as soon as it is ready.
+
+    Parameters
+    ----------
+    data_path: str
+        location of the interest netflix data that will be processed.
+    output_path: str
+        location of the parquet file where the processed netflix data is
+         written.
+    chunksize: int
+        Number of rows read at a time.
+    profiles_dict: dict
+        Mapping from the original profile name to the anonymized one. If it is
+         not given it is obtained with get_profiles_dict_from_chunks.
+
+    Returns
+    -------
+    total_rows: int
+        Number of processed rows written into output_path.
+
+    """
+    logging.info(f'Streaming the netflix information in chunks of {chunksize}')
+    if profiles_dict is None:
+        profiles_dict = get_profiles_dict_from_chunks(data_path, chunksize)
+    total_rows = 0
+    writers = {}
+    empty_outputs = {}
+    with open_raw_data(data_path) as raw_file:
+        for chunk in read_csv_chunks(raw_file, RAW_SCHEMA, chunksize):
+            processed_chunk = process_netflix_data(chunk, profiles_dict)
+            chunk_with_series = identify_series_in_data(processed_chunk)
+            append_data(writers, empty_outputs, output_path, chunk_with_series)
+            total_rows += len(chunk_with_series)
+    close_writers(writers, empty_outputs)
+    logging.info(f'Streamed {total_rows} rows into {output_path}.')
+    return total_rows
+
+
+def append_data(writers, empty_outputs, path, data):
+    """
+    Appends a chunk of data to a parquet file. The writer of the file is
+     opened with the first chunk that has rows (the columns of an empty chunk
+     may have no type yet) and every chunk is cast to its types. The files
+     that only get empty chunks are saved by close_writers.
+
+    Parameters
+    ----------
+    writers: dict
+        Mapping from the path of each file to its open pq.ParquetWriter.
+    empty_outputs: dict
+        Mapping from the path of each file to an empty chunk of it.
+    path: str
+        Path of the parquet file.
+    data: pd.DataFrame
+        Chunk of data (its index is not written).
+
+    Returns
+    -------
+    None
+    """
+    if data.empty:
+        empty_outputs.setdefault(path, data)
+        return
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    if path not in writers:
+        # Columns that are empty in the first chunk are kept as strings and
+        # categoricals use the same dictionary index type in every chunk
+        # (each chunk has its own categories).
+        schema = pa.schema([
+            field.with_type(get_stream_type(field.type))
+            for field in table.schema
+        ])
+        writers[path] = pq.ParquetWriter(path, schema)
+    writers[path].write_table(table.cast(writers[path].schema))
+
+
+def close_writers(writers, empty_outputs):
+    """
+    Closes the writers opened by append_data and saves the files that only
+     got empty chunks.
+
+    Parameters
+    ----------
+    writers: dict
+        Mapping from the path of each file to its open pq.ParquetWriter.
+    empty_outputs: dict
+        Mapping from the path of each file to an empty chunk of it.
+
+    Returns
+    -------
+    paths: list
+        Paths of every written file.
+    """
+    for writer in writers.values():
+        writer.close()
+    for path, data in empty_outputs.items():
+        if path not in writers:
+            data.to_parquet(path, index=False)
+    return list(writers) + [
+        path for path in empty_outputs if path not in writers
+    ]
+
+
+def get_stream_type(field_type):
+    """
+    Get the type with which a column of the first chunk is written by
+     append_data, so every chunk can be cast to it.
+
+    Parameters
+    ----------
+    field_type: pa.DataType
+        Type of the column in the first chunk.
+
+    Returns
+    -------
+    stream_type: pa.DataType
+        Type of the column in the written file.
+
+    """
+    if pa.types.is_null(field_type):
+        return pa.string()
+    if pa.types.is_dictionary(field_type):
+        value_type = field_type.value_type
+        if pa.types.is_null(value_type):
+            value_type = pa.string()
+        return pa.dictionary(pa.int32(), value_type)
+    if pa.types.is_list(field_type):
+        return pa.list_(get_stream_type(field_type.value_type))
+    return field_type
+
+
+@instrumented
+def get_new_netflix_data(data_path, watermark, profiles_dict,
+                         chunksize=CHUNKSIZE):
+    """
+    Get only the rows of the netflix data that are newer than the watermark
+     of their profile and process them. The file is read in chunks and the
+     old rows are discarded right away, so the work done depends on the
+     number of new rows. The order of the profiles in the file is also
+     kept, so the new rows can be put where a full process puts them (see
+     merge_netflix_data).
+
+    Parameters
+    ----------
+    data_path: str
+        location of the interest netflix data that will be processed.
+    watermark: dict
+        Last start_time (as a string) that was already ingested for each
+         anonymized profile. Profiles that are not in it are completely new.
+    profiles_dict: dict
+        Mapping from the original profile name to the anonymized one.
+    chunksize: int
+        Number of rows read at a time.
+
+    Returns
+    -------
+    new_netflix_data: pd.DataFrame
+        Processed netflix data of the new rows.
+    profiles: list
+        Anonymized profiles in the order they appear in the file.
+
+    """
+    logging.info('Getting the new netflix information.')
+    # Last ingested start_time of each original profile name (NaT for the
+    # new profiles).
+    last_start_times = pd.Series({
+        profile_name: watermark.get(profile)
+        for profile_name, profile in profiles_dict.items()
+    }, dtype='datetime64[ns]')
+    new_chunks = []
+    profiles = []
+    with open_raw_data(data_path) as raw_file:
+        for chunk in read_csv_chunks(raw_file, RAW_SCHEMA, chunksize):
+            profiles.extend(
+                profiles_dict[profile_name]
+                for profile_name in chunk['Profile Name'].unique()
+                if profiles_dict[profile_name] not in profiles
+            )
+            last_start_time = last_start_times.reindex(
+                chunk['Profile Name']
+            ).to_numpy()
+            is_new = pd.isna(last_start_time) | (
+                chunk['Start Time'].to_numpy() > last_start_time
+            )
+            new_chunks.append(chunk[is_new])
+    new_rows = pd.concat(new_chunks, ignore_index=True)
+    logging.info(f'Found {len(new_rows)} new rows.')
+    new_netflix_data = process_netflix_data(new_rows, profiles_dict)
+    return identify_series_in_data(new_netflix_data), profiles
+
+
+def merge_netflix_data(new_netflix_data, netflix_data, profiles):
+    """
+    Merges the new rows with the already processed netflix data in the same
+     order as a full process of the file: netflix exports are grouped by
+     profile from the newest to the oldest row, so the new rows of each
+     profile go just before its old rows.
+
+    Parameters
+    ----------
+    new_netflix_data: pd.DataFrame
+        Processed netflix data of the new rows.
+    netflix_data: pd.DataFrame
+        Netflix data that was already processed.
+    profiles: list
+        Anonymized profiles in the order they appear in the file, profiles
+         that are only in netflix_data go at the end.
+
+    Returns
+    -------
+    netflix_data: pd.DataFrame
+        Merged netflix data.
+
+    """
+    profiles = profiles + [
+        profile for profile in netflix_data.profile_name.unique()
+        if profile not in profiles
+    ]
+    data_by_profile = []
+    for profile in profiles:
+        data_by_profile.append(
+            new_netflix_data[new_netflix_data.profile_name == profile]
+        )
+        data_by_profile.append(
+            netflix_data[netflix_data.profile_name == profile]
+        )
+    return set_categorical_columns(
+        pd.concat(data_by_profile, ignore_index=True)
+    )
+
+
+def get_profiles_hashes(profiles_dict):
+    """
+    Get the anonymized profiles dictionary with the original profile names
+     hashed, so it can be saved without keeping the real names.
+
+    Parameters
+    ----------
+    profiles_dict: dict
+        Mapping from the original profile name to the anonymized one.
+
+    Returns
+    -------
+    profiles_hashes: dict
+        Mapping from the sha256 of the original name to the anonymized one.
+
+    """
+    return {
+        hashlib.sha256(str(profile_name).encode()).hexdigest(): profile
+        for profile_name, profile in profiles_dict.items()
+    }
+
+
+def save_watermark(last_start_times, profiles_dict, path):
+    """
+    Saves the last ingested start_time of each profile and the hashed
+     profiles dictionary, they are used by the next incremental process.
+
+    Parameters
+    ----------
+    last_start_times: pd.Series
+        Last start_time of the ingested netflix data of each profile.
+    profiles_dict: dict
+        Mapping from the original profile name to the anonymized one.
+    path: str
+        Path of the json file.
+
+    Returns
+    -------
+    path: str
+        Path of the json file.
+
+    """
+    watermark_data = {
+        'profiles': get_profiles_hashes(profiles_dict),
+        'watermark': last_start_times.astype(str).to_dict(),
+    }
+    with open(path, 'w') as watermark_file:
+        json.dump(watermark_data, watermark_file, indent=4)
+    logging.info(f'Watermark saved into {path}: {watermark_data["watermark"]}')
+    return path
+
+
+def load_watermark(path, profiles_dict):
+    """
+    Loads the watermark saved by save_watermark. It is only valid if the
+     profiles that were already ingested are still anonymized the same way.
+
+    Parameters
+    ----------
+    path: str
+        Path of the json file.
+    profiles_dict: dict
+        Current mapping from the original profile name to the anonymized one.
+
+    Returns
+    -------
+    watermark: dict
+        Last start_time ingested for each anonymized profile, None if there is
+         no valid watermark.
+
+    """
+    if not os.path.exists(path):
+        logging.info('There is no watermark.')
+        return None
+    with open(path) as watermark_file:
+        watermark_data = json.load(watermark_file)
+    profiles_hashes = get_profiles_hashes(profiles_dict)
+    for profile_hash, profile in watermark_data['profiles'].items():
+        if profiles_hashes.get(profile_hash) != profile:
+            logging.info('The profiles changed, the watermark is not valid.')
+            return None
+    return watermark_data['watermark']
+
+
+@instrumented
+def identify_series_in_data(netflix_data, locales=None):
+    """
+    This function tries to identify which are the series on the netflix data
+     given. Then it creates an additional column indicating if the row is of a
+     movie or a series (False or True respectively).
+
+    The traits of every locale are compiled into a single pattern, which is
+     searched once in each unique title (titles repeat a lot), and the result
+     is mapped back to the rows.
+
+    Parameters
+    ----------
+    netflix_data: pd.DataFrame
+        Pandas dataframe that must have the column title
+    locales: list
+        Locales of SERIES_TRAITS to look for, if not given all of them are
+         used.
+
+    Returns
+    -------
+    netflix_data: pd.DataFrame
+        Updated Pandas DataFrame with the new column 'is_serie'.
+
+    """
+    locales = tuple(sorted(locales or SERIES_TRAITS))
+    series_pattern = get_series_pattern(locales)
+    logging.debug('Identifying series with the traits of: %s', locales)
+    title_codes, unique_titles = pd.factorize(netflix_data.title)
+    unique_is_serie = pd.Series(unique_titles).str.contains(
+        series_pattern
+    ).to_numpy(dtype=bool)
+    # Missing titles (code -1) are not series.
+    is_serie = np.append(unique_is_serie, False)[title_codes]
+    netflix_data['is_serie'] = is_serie
+    return netflix_data
+
+
+@lru_cache(maxsize=None)
+def get_series_pattern(locales):
+    """
+    Compiles the series traits of the given locales into a single pattern
+     (the compiled pattern is cached).
+
+    Parameters
+    ----------
+    locales: tuple
+        Locales of SERIES_TRAITS.
+
+    Returns
+    -------
+    series_pattern: re.Pattern
+        Pattern that matches any of the traits.
+    """
+    traits = sorted({
+        trait for locale in locales for trait in SERIES_TRAITS[locale]
+    })
+    return re.compile('|'.join(re.escape(trait) for trait in traits))
+
+
+def register_series_traits(locale, traits):
+    """
+    Adds (or replaces) the series traits of a locale, so the titles of that
+     locale are identified as series too.
+
+    Parameters
+    ----------
+    locale: str
+        Name of the locale (for example 'pt').
+    traits: list
+        Markers that netflix adds to the titles of series in that locale.
+
+    Returns
+    -------
+    None
+    """
+    SERIES_TRAITS[locale] = list(traits)
+    get_series_pattern.cache_clear()
+
+
+@instrumented
+def movie_and_series_information(df, profile=''):
+    """
+    This function gets information of the dataframe depending on the condition
+    if it is a movie or if it is a series.
+    For the movies part, the function 'get_movies_information' is applied so
+     that many registers of the same movie can be summarised into one row.
+    For the series part, the function 'get_series_information' is applied to
+    get all the information related to how the series was consumed.
+
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        Dataframe obtained from the netflix data, in this case the 'is_series'
+         component must be in the dataframe (this comes from the
+         identify_series_in_data function).
+    profile: str
+        profile name from which to filter.
+
+    Returns
+    -------
+    information: tuple
+        Tuple containing the four different dataframes:
+            - movies: df of just the movies.
+            - series: df of just the series.
+            - movies_information: Df of the resumed information of the movies.
+            - series_information: Df of the resumed information of the series.
+    """
+    movies, series = split_movies_and_series(df, profile)
+
+    logging.info('Analyzing only movies data.')
+    movies_information = get_titles_information(movies, 'movie')
+
+    # Data for series
+    logging.info('Analyzing only series data.')
+    series_information = get_titles_information(series, 'series')
+    information = movies, series, movies_information, series_information
+    return information
+
+
+def get_titles_information(titles, kind, profiles=None):
+    """
+    Summarises the movies or the series given by split_movies_and_series,
+     so the data in memory and the data summarised bucket by bucket (see
+     get_bucket_information) get the same summaries.
+
+    Parameters
+    ----------
+    titles: pd.DataFrame
+        Movies or series given by split_movies_and_series (with by_profile
+         if profiles are given).
+    kind: str
+        Kind of titles, movie or series.
+    profiles: list
+        If given, the titles are summarised by profile and title in a single
+         pass and the summary is split by profile, in this order.
+
+    Returns
+    -------
+    information: pd.DataFrame or list
+        Summary of the titles, or the summary of each profile if profiles
+         are given.
+    """
+    if kind == 'movie':
+        if profiles is None:
+            return get_movies_information(titles)
+        return [
+            information.drop(columns='profile_name').reset_index(drop=True)
+            for information in split_by_profile(
+                get_movies_information(titles, keys=['profile_name', 'title']),
+                profiles,
+            )
+        ]
+    if profiles is None:
+        return get_series_information(titles)
+    return [
+        information.droplevel('profile_name')
+        for information in split_by_profile(
+            get_series_information(titles, keys=['profile_name', 'new_title']),
+            profiles,
+            level='profile_name',
+        )
+    ]
+
+
+def split_movies_and_series(df, profile='', by_profile=False):
+    """
+    Splits the netflix data into movies and series. The movies get the
+     additional column individual_start with the number of times each title
+     was started.
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        Dataframe obtained from the netflix data, in this case the 'is_series'
+         component must be in the dataframe (this comes from the
+         identify_series_in_data function).
+    profile: str
+        profile name from which to filter.
+    by_profile: bool
+        If True individual_start counts the starts of each title within its
+         own profile.
+
+    Returns
+    -------
+    movies: pd.DataFrame
+        df of just the movies.
+    series: pd.DataFrame
+        df of just the series.
+    """
+    # We are filtering through a single profile.
+    if profile:
+        logging.info(f'Filtering netlfix data to only profile:{profile}.')
+        data = df[df.profile_name == profile].copy()
+    else:
+        data = df.copy()
 
-from time import perf_counter
+    if by_profile:
+        individual_start = data.groupby(
+            ['profile_name', 'title'], observed=True
+        ).title.transform('size')
+    else:
+        individual_start = data.groupby(
+            'title', observed=True
+        ).title.transform('size')
+    data.loc[data.is_serie == False, 'individual_start'] = individual_start
+    # The series have no value, so it is a float column even if the data
+    # has no series.
+    data.individual_start = data.individual_start.astype(float)
+    movies = data[data.is_serie == False]
+    series = data[data.is_serie == True]
+    return movies, series
 
 
-def process_netflix_data(df):
+@instrumented
+def movie_and_series_information_by_profile(df):
     """
-    This function makes a transformation of the raw data given by netflix by
-    applying certain relevant steps:
-        1) Transformation of column names (makes easier the manipulation for
-            further dataframe operations).
-        2) Anonymize the profiles (relevant if personal information is a deal).
-        3) Transform object of dates into real datetime objects.
-        4) Transform object of duration into a float value.
-        5) Generate additional columns: end_time, new_title
-        6) Drop non-used columns.
+    This function gets the information of movie_and_series_information for
+     the whole dataframe and for each of the profiles. The profiles are not
+     filtered one by one: the summaries are grouped by profile and title in
+     a single pass and then split by profile.
 
     Parameters
     ----------
     df: pd.DataFrame
-        The raw data given by netflix.
+        Dataframe obtained from the netflix data, in this case the 'is_series'
+         component must be in the dataframe (this comes from the
+         identify_series_in_data function).
 
     Returns
     -------
-    netflix_data: pd.DataFrame
-        Processed netflix data.
-
+    general_information: tuple
+        Tuple given by movie_and_series_information for the whole dataframe.
+    profile_information: pd.Series
+        Series indexed by profile_name with the tuple given by
+         movie_and_series_information for each profile.
     """
-    # Transform columns for an easier manipulation
-    tick = perf_counter()
-    logging.info('Renaming columns.')
-    new_columns = {
-        col: col.lower().strip().replace(' ', '_')
-        for col in df.columns
-    }
-    logging.info(f'Renaming columns: {new_columns}.')
-    df.rename(columns=new_columns, inplace=True)
+    general_information = movie_and_series_information(df)
+    profiles = sorted(df.profile_name.unique())
+    movies, series = split_movies_and_series(df, by_profile=True)
+    profile_information = zip(
+        split_by_profile(movies, profiles),
+        split_by_profile(series, profiles),
+        get_titles_information(movies, 'movie', profiles),
+        get_titles_information(series, 'series', profiles),
+    )
+    profile_information = pd.Series(
+        dict(zip(profiles, profile_information)), dtype=object
+    )
+    return general_information, profile_information
 
-    # Transform star_time into a datetime
-    df.start_time = pd.to_datetime(df.start_time)
-    df.start_time = df.start_time  # - datetime.timedelta(hours=6)
 
-    # Anonymize the different profiles
-    profiles_dict = {
-        profile_name: f'profile_{num}'
-        for num, profile_name
-        in enumerate(
-            df.groupby(
-                'profile_name'
-            ).start_time.min().sort_values().index
-        )
-    }
-    logging.info(f'Renaming profile_name: {profiles_dict}.')
-    df.profile_name = df.profile_name.apply(
-        lambda x: profiles_dict[x]
-    )
+def split_by_profile(data, profiles, level=None):
+    """
+    Splits a dataframe into one dataframe per profile, in a single pass.
 
-    logging.info('Getting duration as time_delta.')
+    Parameters
+    ----------
+    data: pd.DataFrame
+        Dataframe with the profile_name as a column (or as an index level).
+    profiles: list
+        Profiles in the order they must be returned.
+    level: str
+        Name of the index level with the profile_name, if it is not a column.
 
-    df.duration = df.duration.apply(
-        get_duration_timedelta
-    )
-    logging.info('Getting end_time from duration time_delta.')
-    df['end_time'] = df.start_time + df.duration
-    df.duration = df.duration.apply(
-        lambda x: x.total_seconds()
-    )
-    logging.info('Changing title to new_title.')
-    df['new_title'] = df.title.apply(lambda x: x.split(':')[0])
+    Returns
+    -------
+    profile_data: list
+        Dataframe of each profile (empty if the profile has no rows).
+    """
+    if level:
+        grouped = data.groupby(level=level, observed=True)
+    else:
+        grouped = data.groupby('profile_name', observed=True)
+    groups = dict(tuple(grouped))
+    return [groups.get(profile, data.iloc[:0]) for profile in profiles]
 
-    logging.info('Removing non-played by profile.')
-    df_no_auto_played = df[df.attributes.isna()]
-    netflix_data = df_no_auto_played[
-        df_no_auto_played.supplemental_video_type.isna()
-    ]
-    non_used_cols = ['attributes', 'supplemental_video_type']
-    logging.info(f'Removing non_used_columns: {non_used_cols}.')
 
-    netflix_data.drop(non_used_cols, axis=1, inplace=True)
-    logging.info(f'Removing non_used_columns: {non_used_cols}.')
-    tock = perf_counter()
-    time_it_took = tock - tick
-    logging.info(f'Processing netflix data took {time_it_took} seconds.')
-    return netflix_data
+def read_interim_chunks(data_file, chunksize=CHUNKSIZE, columns=None):
+    """
+    Reads a parquet file of the interim data in chunks of a bounded number of
+     rows.
+
+    Parameters
+    ----------
+    data_file: str
+        Path of the parquet file.
+    chunksize: int
+        Number of rows read at a time.
+    columns: list
+        Columns to read, if not given every column is read.
+
+    Yields
+    ------
+    chunk: pd.DataFrame
+        Rows of the chunk, with categorical columns.
+    """
+    parquet_file = pq.ParquetFile(data_file)
+    for batch in parquet_file.iter_batches(
+        batch_size=chunksize, columns=columns
+    ):
+        yield set_categorical_columns(batch.to_pandas())
 
 
-def get_duration_timedelta(string_time=None, time_format="%H:%M:%S"):
+def add_counts(counts, chunk_counts):
     """
-    This is a function to obtain a string that indicates duration as hh:mm:ss
-     to an actual timedelta value.
+    Adds the counts of a chunk to the counts of the previous chunks.
 
     Parameters
     ----------
-    string_time: str
-        String that indicates a duration.
-    time_format:
-        Format in which the string is given. It will be by default "%H:%M:%S".
+    counts: pd.Series
+        Counts of the previous chunks (None for the first chunk).
+    chunk_counts: pd.Series
+        Counts of the chunk, with the same index levels.
 
     Returns
     -------
-    timedelta: datetime.timedelta
-        converts the given duration to a time delta so it can be used in
-        different datetime operations.
+    counts: pd.Series
+        Counts of every chunk so far.
+    """
+    if counts is None:
+        return chunk_counts
+    levels = list(range(counts.index.nlevels))
+    return pd.concat([counts, chunk_counts]).groupby(level=levels).sum()
 
+
+@instrumented
+def get_streamed_data_summary(netflix_data_file, chunksize=CHUNKSIZE):
     """
-    logging.info(
-        f'Transforming the string time "{string_time}" into datetime.'
-    )
+    Reads the processed netflix data in chunks, only with the columns needed
+     to summarise it: the last start_time of each profile and the number of
+     rows of each movie and series.
 
-    strptime = datetime.datetime.strptime(string_time, time_format).time()
-    timedelta = datetime.timedelta(
-        hours=strptime.hour,
-        minutes=strptime.minute,
-        seconds=strptime.second,
-        microseconds=strptime.microsecond,
+    Parameters
+    ----------
+    netflix_data_file: str
+        Path of the processed netflix data (see stream_netflix_data).
+    chunksize: int
+        Number of rows read at a time.
+
+    Returns
+    -------
+    summary: dict
+        Series with the last start_time of each profile (last_start_times),
+         the number of rows of each movie (movie_rows), of each movie within
+         each profile (profile_movie_rows) and of each series (series_rows).
+    """
+    summary = dict.fromkeys([
+        'last_start_times', 'movie_rows', 'profile_movie_rows', 'series_rows',
+    ])
+    chunks = read_interim_chunks(
+        netflix_data_file,
+        chunksize,
+        columns=['profile_name', 'start_time', 'title', 'new_title',
+                 'is_serie'],
     )
-    return timedelta
+    for chunk in chunks:
+        movies = chunk[~chunk.is_serie]
+        series = chunk[chunk.is_serie]
+        last_start_times = chunk.groupby(
+            'profile_name', observed=True
+        ).start_time.max()
+        summary['last_start_times'] = pd.concat(
+            [summary['last_start_times'], last_start_times]
+        ).groupby(level=0).max()
+        summary['movie_rows'] = add_counts(
+            summary['movie_rows'],
+            movies.groupby('title', observed=True).size(),
+        )
+        summary['profile_movie_rows'] = add_counts(
+            summary['profile_movie_rows'],
+            movies.groupby(['profile_name', 'title'], observed=True).size(),
+        )
+        summary['series_rows'] = add_counts(
+            summary['series_rows'],
+            series.groupby('new_title', observed=True).size(),
+        )
+    return summary
 
 
-def get_netflix_data(data_path):
+def get_title_buckets(title_rows, chunksize=CHUNKSIZE):
     """
-    Get the netflix data and process it.
+    Splits the sorted titles into buckets of consecutive titles with about
+     chunksize rows each (a title is never split), so each bucket can be
+     summarised on its own and the summaries of the buckets, one after the
+     other, are sorted by title.
 
     Parameters
     ----------
-    data_path: str
-        location of the interest netflix data that will be processed.
+    title_rows: pd.Series
+        Number of rows of each title.
+    chunksize: int
+        Number of rows of each bucket.
 
     Returns
     -------
-    netflix_data_with_series: pd.DataFrame
-        A data frame with the information of the processed netflix data.
-
+    title_buckets: pd.Series
+        Number of the bucket of each title, in increasing order.
     """
-    logging.info('Getting the netflix information')
-    netflix_data_all = pd.read_csv(data_path)
-    processed_netflix_data = process_netflix_data(netflix_data_all)
-    netflix_data_with_series = identify_series_in_data(processed_netflix_data)
-    return netflix_data_with_series
+    title_rows = title_rows.sort_index()
+    previous_rows = title_rows.cumsum() - title_rows
+    return (previous_rows // chunksize).astype(int)
 
 
-def identify_series_in_data(netflix_data):
+@instrumented
+def stream_movies_and_series(netflix_data_file, interim_data_path,
+                             buckets_path, summary, chunksize=CHUNKSIZE):
     """
-    This function tries to identify which are the series on the netflix data
-     given. Then it creates an additional column indicating if the row is of a
-     movie or a series (0 or 1 respectively).
+    Splits the processed netflix data into movies and series (the same data
+     saved by save_dict_data, see split_movies_and_series) in chunks, so they
+     are written in the order of the netflix data without being held in
+     memory. The movies and the series are also written into the bucket of
+     their title (see get_title_buckets), to be summarised by
+     stream_information.
 
     Parameters
     ----------
-    netflix_data: pd.DataFrame
-        Pandas dataframe that must have the column title
+    netflix_data_file: str
+        Path of the processed netflix data (see stream_netflix_data).
+    interim_data_path: str
+        Folder where the movies and series are saved.
+    buckets_path: str
+        Folder where the buckets are saved.
+    summary: dict
+        Summary of the netflix data given by get_streamed_data_summary.
+    chunksize: int
+        Number of rows read at a time.
 
     Returns
     -------
-    netflix_data: pd.DataFrame
-        Updated Pandas DataFrame with the new column 'is_serie'.
-
+    saved_files: list
+        Paths of the saved movies and series.
+    bucket_files: dict
+        Paths of the movie buckets and of the series buckets, in the order
+         of their titles.
     """
-    series_traits_list = [
-        ": Season",
-        ": Book",
-        "(Episode ",
-        " : Episode ",
-        " : Part ",
-        "(Chapter ",
-        " : Chapter ",
-        ": Temporada",
-        ": Libro",
-        "(Capítulo ",
-        " : Capítulo ",
-        " : Parte ",
-        " : Episodio ",
-        "(Episodio ",
-    ]
-    logging.info(f'Identifying if title contains any of: {series_traits_list}')
-    series_trait_df = netflix_data.title == 'initialization of a false series'
-    for series_trait in series_traits_list:
-        series_trait_df += netflix_data.title.str.contains(
-            series_trait,
-            regex=False
+    profiles = sorted(summary['last_start_times'].index)
+    movie_buckets = get_title_buckets(summary['movie_rows'], chunksize)
+    series_buckets = get_title_buckets(summary['series_rows'], chunksize)
+    writers = {}
+    empty_outputs = {}
+    bucket_writers = {}
+    for chunk in read_interim_chunks(netflix_data_file, chunksize):
+        is_movie = ~chunk.is_serie
+        movies = chunk[is_movie]
+        general_data = chunk.assign(individual_start=np.nan)
+        general_data.loc[is_movie, 'individual_start'] = \
+            summary['movie_rows'].reindex(movies.title).to_numpy()
+        profile_data = chunk.assign(individual_start=np.nan)
+        profile_data.loc[is_movie, 'individual_start'] = \
+            summary['profile_movie_rows'].reindex(
+                pd.MultiIndex.from_arrays([movies.profile_name, movies.title])
+            ).to_numpy()
+        outputs = {
+            'general_movie': general_data[is_movie],
+            'general_series': general_data[~is_movie],
+        }
+        profile_rows = zip(
+            split_by_profile(profile_data[is_movie], profiles),
+            split_by_profile(profile_data[~is_movie], profiles),
         )
+        for profile_num, (profile_movies, profile_series) in enumerate(
+            profile_rows
+        ):
+            outputs[f'profile_{profile_num}_movie'] = profile_movies
+            outputs[f'profile_{profile_num}_series'] = profile_series
+        for name, data in outputs.items():
+            append_data(
+                writers,
+                empty_outputs,
+                f'{interim_data_path}/{name}.{INTERIM_FORMAT}',
+                data,
+            )
 
-    netflix_data.loc[series_trait_df, 'is_serie'] = True
-    netflix_data.loc[~series_trait_df, 'is_serie'] = False
-    return netflix_data
+        bucket_rows = [
+            ('movie', movies, movie_buckets.reindex(movies.title)),
+            ('series', chunk[~is_movie], series_buckets.reindex(
+                chunk.new_title[~is_movie]
+            )),
+        ]
+        for kind, data, buckets in bucket_rows:
+            for bucket, bucket_data in data.groupby(buckets.to_numpy()):
+                bucket_file = os.path.join(
+                    buckets_path, f'{kind}_{int(bucket)}.{INTERIM_FORMAT}'
+                )
+                bucket_writers[(kind, int(bucket))] = bucket_file
+                append_data(writers, empty_outputs, bucket_file, bucket_data)
+    bucket_paths = set(bucket_writers.values())
+    saved_files = [
+        path for path in close_writers(writers, empty_outputs)
+        if path not in bucket_paths
+    ]
+    bucket_files = {
+        kind: [
+            bucket_writers[key] for key in sorted(bucket_writers)
+            if key[0] == kind
+        ]
+        for kind in ['movie', 'series']
+    }
+    return saved_files, bucket_files
 
 
-def movie_and_series_information(df, profile=''):
+def get_bucket_information(data, kind, profiles):
     """
-    This function gets information of the dataframe depending on the condition
-    if it is a movie or if it is a series.
-    For the movies part, the function 'merge_different_individual_start' is
-     applied so that many registers of the same movie can be summarised into
-     one row.
-    For the series part, the function 'get_series_info' is applied to get all
-    the information related to how the series was consumed.
+    Summarises the movies or the series of a bucket for the whole data and
+     for each profile, as movie_and_series_information_by_profile does.
+
+    Parameters
+    ----------
+    data: pd.DataFrame
+        Processed netflix data of the bucket (see stream_movies_and_series).
+    kind: str
+        Kind of titles of the bucket, movie or series.
+    profiles: list
+        Sorted profiles of the netflix data.
+
+    Returns
+    -------
+    information: dict
+        Summary of each file, with the names given by save_dict_data.
+    """
+    # Position of the movies or the series in split_movies_and_series.
+    position = 0 if kind == 'movie' else 1
+    information = {
+        f'general_{kind}_info': get_titles_information(
+            split_movies_and_series(data)[position], kind
+        )
+    }
+    profile_information = get_titles_information(
+        split_movies_and_series(data, by_profile=True)[position],
+        kind,
+        profiles,
+    )
+    for profile_num, profile_info in enumerate(profile_information):
+        information[f'profile_{profile_num}_{kind}_info'] = profile_info
+    return information
 
 
+@instrumented
+def stream_information(netflix_data_file, bucket_files, interim_data_path,
+                       profiles):
+    """
+    Summarises the movies and the series bucket by bucket. Every row of a
+     title is in the same bucket, so the summaries are the same as the ones
+     of the whole data, and they are appended to their files in the order of
+     the buckets, so they are sorted by title.
+
     Parameters
     ----------
-    df: pd.DataFrame
-        Dataframe obtained from the netflix data, in this case the 'is_series'
-         component must be in the dataframe (this comes from the
-         identify_series_in_data function).
-    profile: str
-        profile name from which to filter.
+    netflix_data_file: str
+        Path of the processed netflix data (see stream_netflix_data).
+    bucket_files: dict
+        Paths of the movie buckets and of the series buckets, in the order
+         of their titles (see stream_movies_and_series).
+    interim_data_path: str
+        Folder where the summaries are saved.
+    profiles: list
+        Sorted profiles of the netflix data.
 
     Returns
     -------
-    information: tuple
-        Tuple containing the four different dataframes:
-            - movies: df of just the movies.
-            - series: df of just the series.
-            - movies_information: Df of the resumed information of the movies.
-            - series_information: Df of the resumed information of the series.
+    saved_files: list
+        Paths of the saved summaries.
     """
-    tick = perf_counter()
-    # We are filtering through a single profile.
-    if profile:
-        logging.info(f'Filtering netlfix data to only profile:{profile}.')
-        data = df[df.profile_name == profile]
-    else:
-        data = df.copy()
+    # Summaries of no rows, so every file is saved even if there are no
+    # movies or no series.
+    empty_data = pq.read_schema(netflix_data_file).empty_table().to_pandas()
+    writers = {}
+    empty_outputs = {}
+    for kind in ['movie', 'series']:
+        for bucket_file in bucket_files[kind] or [None]:
+            if bucket_file is None:
+                data = empty_data
+            else:
+                data = set_categorical_columns(pd.read_parquet(bucket_file))
+            outputs = get_bucket_information(data, kind, profiles)
+            for name, information in outputs.items():
+                append_data(
+                    writers,
+                    empty_outputs,
+                    f'{interim_data_path}/{name}.{INTERIM_FORMAT}',
+                    information,
+                )
+    return close_writers(writers, empty_outputs)
+
+
+@instrumented
+def stream_movie_and_series_information(netflix_data_file, interim_data_path,
+                                        chunksize=CHUNKSIZE):
+    """
+    Splits the processed netflix data into movies and series and summarises
+     them (the same files saved by save_dict_data) reading it in chunks, so
+     the memory used depends on chunksize and on the rows of the largest
+     title instead of on the size of the data. The rows are grouped into
+     buckets of titles in a temporary folder inside interim_data_path.
 
-    data.loc[data.is_serie == False, 'individual_start'] = data.title.map(
-        data.title.value_counts()
-    )
+    Parameters
+    ----------
+    netflix_data_file: str
+        Path of the processed netflix data (see stream_netflix_data).
+    interim_data_path: str
+        Folder where the movies, series and summaries are saved.
+    chunksize: int
+        Number of rows read at a time and of each bucket.
 
-    logging.info('Analyzing only movies data.')
-    movies = data[data.is_serie == False]
-    movies_information = movies \
-        .groupby('title') \
-        .apply(merge_different_individual_start) \
-        .drop_duplicates('title')
+    Returns
+    -------
+    saved_files: list
+        Paths of the saved files.
+    last_start_times: pd.Series
+        Last start_time of each profile.
+    """
+    summary = get_streamed_data_summary(netflix_data_file, chunksize)
+    with tempfile.TemporaryDirectory(dir=interim_data_path) as buckets_path:
+        saved_files, bucket_files = stream_movies_and_series(
+            netflix_data_file,
+            interim_data_path,
+            buckets_path,
+            summary,
+            chunksize=chunksize,
+        )
+        saved_files += stream_information(
+            netflix_data_file,
+            bucket_files,
+            interim_data_path,
+            sorted(summary['last_start_times'].index),
+        )
+    return saved_files, summary['last_start_times']
 
-    # Data for series
-    logging.info('Analyzing only series data.')
-    series = data[data.is_serie == True]
-    series_information = series\
-        .groupby('new_title')\
-        .apply(get_series_info)
-    tock = perf_counter()
-    time_it_took = tock - tick
-    logging.info(
-        f'Getting movies and series info took {time_it_took} seconds.'
+
+@instrumented
+def update_information(netflix_data, new_netflix_data, interim_data_path):
+    """
+    Updates the movies and series information saved in the interim data with
+     the new rows of the netflix data. Only the titles that appear in the new
+     rows are summarised again, the rest of the information is kept.
+
+    Parameters
+    ----------
+    netflix_data: pd.DataFrame
+        All the processed netflix data (old and new rows).
+    new_netflix_data: pd.DataFrame
+        Processed netflix data of the new rows.
+    interim_data_path: str
+        Path of the interim data where the previous information was saved.
+
+    Returns
+    -------
+    info_series_movies: dict
+        Dictionary with the resumed information, with the same composition as
+         the one given by arrange_information_in_dict.
+
+    """
+    new_movie_titles = new_netflix_data[
+        ~new_netflix_data.is_serie
+    ].title.unique()
+    new_series_titles = new_netflix_data[
+        new_netflix_data.is_serie
+    ].new_title.unique()
+    updated_titles = (
+        ~netflix_data.is_serie & netflix_data.title.isin(new_movie_titles)
+    ) | (
+        netflix_data.is_serie & netflix_data.new_title.isin(new_series_titles)
     )
-    information = movies, series, movies_information, series_information
-    return information
+    general_ms, profile_ms = movie_and_series_information_by_profile(
+        netflix_data[updated_titles]
+    )
+    movies, series = split_movies_and_series(netflix_data)
+    info_series_movies = {
+        'general': {
+            'movie': movies,
+            'series': series,
+            'movie_info': merge_information(
+                interim_data_path, 'general_movie_info', general_ms[2], 'title'
+            ),
+            'series_info': merge_information(
+                interim_data_path,
+                'general_series_info',
+                general_ms[3],
+                'new_title',
+            ),
+        }
+    }
+    profiles = sorted(netflix_data.profile_name.unique())
+    profile_movies, profile_series = split_movies_and_series(
+        netflix_data, by_profile=True
+    )
+    profile_rows = zip(
+        profiles,
+        split_by_profile(profile_movies, profiles),
+        split_by_profile(profile_series, profiles),
+    )
+    for profile, movies, series in profile_rows:
+        # Profiles without updated titles keep their saved information.
+        _, _, movie_info, series_info = profile_ms.get(
+            profile, (None, None, pd.DataFrame(), pd.DataFrame())
+        )
+        info_series_movies[profile] = {
+            'movie': movies,
+            'series': series,
+            'movie_info': merge_information(
+                interim_data_path, f'{profile}_movie_info', movie_info, 'title'
+            ),
+            'series_info': merge_information(
+                interim_data_path,
+                f'{profile}_series_info',
+                series_info,
+                'new_title',
+            ),
+        }
+    return info_series_movies
 
 
-def merge_different_individual_start(df):
+@instrumented
+def merge_information(interim_data_path, name, new_information, key):
     """
-    This function must be executed on small dataframes where the same title is
-    given. It measures different individual starts of movies and returns a
-    list of the relevant information.
+    Merges a summary saved in the interim data with the summary of the
+     updated titles, which replaces the saved rows of the same titles.
 
     Parameters
     ----------
-    df: pd.DataFrame
-        Small dataframe which is used to merge the information of certain
-         features into list. Then those features are dropped.
+    interim_data_path: str
+        Path of the interim data where the previous information was saved.
+    name: str
+        Name of the saved file.
+    new_information: pd.DataFrame
+        Summary of the updated titles.
+    key: str
+        Column that identifies each title in the summary.
+
+    Returns
+    -------
+    information: pd.DataFrame
+        Summary with the information of all the titles.
+
+    """
+    saved_file = os.path.join(interim_data_path, f'{name}.{INTERIM_FORMAT}')
+    if not os.path.exists(saved_file):
+        return new_information
+    information = read_interim_data(saved_file)
+    if new_information.empty:
+        return information
+    # List columns are read as numpy arrays, they are turned back into lists
+    # so they can be saved together with the new information.
+    for col in information.select_dtypes(object).columns:
+        if information[col].map(lambda x: isinstance(x, np.ndarray)).any():
+            information[col] = information[col].map(
+                lambda values: pd.Series(values).tolist()
+            )
+    kept_information = information[
+        ~information[key].isin(new_information[key])
+    ]
+    # Sorted by the title as the information summarised at once.
+    return pd.concat(
+        [new_information, kept_information], ignore_index=True
+    ).sort_values(key, ignore_index=True)
+
+
+@instrumented
+def get_movies_information(movies, keys=('title',)):
+    """
+    This function summarises the different individual starts of each movie
+     into one row per movie, with the relevant information merged into
+     lists. All the movies are summarised at once with grouped operations.
+
+    Parameters
+    ----------
+    movies: pd.DataFrame
+        Dataframe of movies whose start_time, end_time and bookmark are merged
+         into lists. The other summarised features are dropped.
 
         This df must contain at least the following columns available:
         - start_time
@@ -269,118 +1540,160 @@ def merge_different_individual_start(df):
         - bookmark
         - duration
         - latest_bookmark
+    keys: tuple
+        Columns that identify each movie.
 
     Returns
     -------
-    df_simplified: pd.DataFrame
-        Dataframe with the new grouped columns and without other columns.
+    movies_information: pd.DataFrame
+        Dataframe with one row per movie with the new grouped columns.
 
     """
-    tick = perf_counter()
-    df['start_time_list'] = [df.start_time.to_list()] * len(df)
-    df['end_time_list'] = [df.end_time.to_list()] * len(df)
-    df['bookmark_list'] = [df.bookmark.to_list()] * len(df)
-    df['total_duration_seen'] = df.duration.sum() / 60
-    drop_columns = [
-        'start_time',
-        'end_time',
-        'duration',
-        'bookmark',
-        'latest_bookmark',
-        'profile_name',
-        'is_serie',
+    keys = list(keys)
+    grouped = movies.groupby(keys, observed=True)
+    group_codes = grouped.ngroup().to_numpy()
+    kept_columns = [
+        col for col in movies.columns
+        if col in keys or col not in MOVIE_SUMMARISED_COLUMNS
     ]
-    for col in drop_columns:
-        if col in df.columns:
-            df = df.drop(col, axis=1)
-    df_simplified = df.reset_index()
-    tock = perf_counter()
-    time_it_took = tock - tick
-    logging.info(
-        f'Mergeing different individual start took {time_it_took} seconds.'
+    # First row of each group, in the order of the group codes (which is not
+    # the sorted order when the keys are categoricals).
+    _, first_rows = np.unique(group_codes, return_index=True)
+    movies_information = movies[kept_columns].iloc[first_rows]
+    movies_information['start_time_list'] = get_group_lists(
+        movies.start_time.dt.to_pydatetime(), group_codes
+    )
+    movies_information['end_time_list'] = get_group_lists(
+        movies.end_time.dt.to_pydatetime(), group_codes
     )
-    return df_simplified
+    movies_information['bookmark_list'] = get_group_lists(
+        movies.bookmark.to_numpy(), group_codes
+    )
+    movies_information['total_duration_seen'] = \
+        grouped.duration.sum().to_numpy() / 60
+    movies_information = movies_information\
+        .sort_values(keys)\
+        .reset_index(drop=True)
+    return movies_information
 
 
-def get_series_info(df):
+@instrumented
+def get_series_information(series, keys=('new_title',)):
     """
-    This function gets relevant information of a dataframe regarding the
-     nature of the series; that is: many chapters and many seasons.
+    This function gets relevant information regarding the nature of the
+     series; that is: many chapters and many seasons. The information of all
+     the series is computed at once with grouped operations.
 
     Parameters
     ----------
-    df: pd.DataFrame
+    series: pd.DataFrame
         This df must contain, at least, the following columns:
         - duration
         - end_time
         - start_time
         - title
+        - new_title
+    keys: tuple
+        Columns that identify each series.
 
     Returns
     -------
-    results: pd.Series
-        Pandas series with a resume on the relevant information of a netflix
-         series.
-
-    """
-    tick = perf_counter()
-    logging.info('Getting additional series information.')
-    total_duration = df.duration.sum() / 3600
-    max_end_time = df.end_time.max()
-    min_start_time = df.start_time.min()
-    total_lapsed_time = (max_end_time - min_start_time).total_seconds() / 3600
-    speed = total_duration / total_lapsed_time
-    chapters = df.title.nunique()
-    title = df.new_title.unique()[0]
-    chapters_titles = df.title.to_list()
-    all_start_times = df.start_time.apply(str).to_list()
-    all_end_times = df.end_time.apply(str).to_list()
-
-    chapter_speed = chapters / total_lapsed_time
-    waiting_time_series = pd.Series(
-        df.start_time.iloc[:-1].to_numpy() - df.end_time.iloc[1:].to_numpy()
-    )
-    waiting_time = waiting_time_series.apply(
-        lambda x: x.total_seconds() / 3600
-    )
-    waiting_time_mean = waiting_time.mean()
-    waiting_time_median = waiting_time.median()
-    waiting_time_std = waiting_time.std()
-    waiting_time_max = waiting_time.max()
-    waiting_time_min = waiting_time.min()
-
-    df['hour'] = df.start_time.apply(lambda x: x.hour + x.minute / 60)
-    all_start_time_hours = df['hour'].to_list()
-
-    results = {
-        'new_title': title,
-        'min_start_time': min_start_time,
-        'max_end_time': max_end_time,
-        'chapters_titles': chapters_titles,
-        'all_start_times': all_start_times,
-        'all_end_times': all_end_times,
-        'all_start_time_hours': all_start_time_hours,
-        'total_duration_hours': total_duration,
-        'total_lapsed_hours': total_lapsed_time,
-        'effective_seen_time': speed,
-        'different_chapters_seen': chapters,
-        'effective_seen_time_in_different_chapters': chapters * speed,
-        'chapter_speed': chapter_speed,
-        'waiting_time_mean': waiting_time_mean,
-        'waiting_time_median': waiting_time_median,
-        'waiting_time_std': waiting_time_std,
-        'waiting_time_max': waiting_time_max,
-        'waiting_time_min': waiting_time_min,
-    }
-    tock = perf_counter()
-    time_it_took = tock - tick
-    logging.info(
-        f'Getting additional series info took {time_it_took} seconds.'
+    series_information: pd.DataFrame
+        Dataframe indexed by the keys with a resume on the relevant
+         information of each netflix series.
+
+    """
+    keys = list(keys)
+    # Waiting time between a chapter and the one watched before it (the data
+    # is ordered from the most recent to the oldest start_time).
+    previous_end_time = series.groupby(
+        keys, sort=False, observed=True
+    ).end_time.shift(-1)
+    series = series.assign(
+        hour=series.start_time.dt.hour + series.start_time.dt.minute / 60,
+        waiting_time=(
+            series.start_time - previous_end_time
+        ).dt.total_seconds() / SECONDS_IN_HOUR,
+    )
+    grouped = series.groupby(keys, observed=True)
+    series_information = grouped.agg(
+        min_start_time=('start_time', 'min'),
+        max_end_time=('end_time', 'max'),
+        total_duration_hours=('duration', 'sum'),
+        different_chapters_seen=('title', 'nunique'),
+        waiting_time_mean=('waiting_time', 'mean'),
+        waiting_time_median=('waiting_time', 'median'),
+        waiting_time_std=('waiting_time', 'std'),
+        waiting_time_max=('waiting_time', 'max'),
+        waiting_time_min=('waiting_time', 'min'),
     )
-    results = pd.Series(results)
-    return results
+    group_codes = grouped.ngroup().to_numpy()
+    series_information['chapters_titles'] = get_group_lists(
+        series.title.to_numpy(), group_codes
+    )
+    series_information['all_start_times'] = get_group_lists(
+        series.start_time.dt.to_pydatetime(), group_codes
+    )
+    series_information['all_end_times'] = get_group_lists(
+        series.end_time.dt.to_pydatetime(), group_codes
+    )
+    series_information['all_start_time_hours'] = get_group_lists(
+        series.hour.to_numpy(), group_codes
+    )
+    series_information.total_duration_hours /= SECONDS_IN_HOUR
+    series_information['total_lapsed_hours'] = (
+        series_information.max_end_time - series_information.min_start_time
+    ).dt.total_seconds() / SECONDS_IN_HOUR
+    speed = series_information.total_duration_hours / \
+        series_information.total_lapsed_hours
+    chapters = series_information.different_chapters_seen
+    series_information['effective_seen_time'] = speed
+    series_information['effective_seen_time_in_different_chapters'] = \
+        chapters * speed
+    series_information['chapter_speed'] = \
+        chapters / series_information.total_lapsed_hours
+    series_information['new_title'] = series_information.index.get_level_values(
+        'new_title'
+    )
+    series_information = series_information[
+        SERIES_INFORMATION_COLUMNS
+    ].sort_index()
+    return series_information
+
+
+def get_group_lists(values, group_codes):
+    """
+    Splits an array into one list per group, keeping the original order of
+     the values inside each group.
+
+    Parameters
+    ----------
+    values: np.ndarray
+        Values to split.
+    group_codes: np.ndarray
+        Number of the group of each value, as given by the ngroup method of a
+         pandas groupby (-1 for values without a group).
+
+    Returns
+    -------
+    group_lists: list
+        List with the list of values of each group, ordered by group number.
+
+    """
+    in_group = group_codes >= 0
+    values = values[in_group]
+    group_codes = group_codes[in_group]
+    if not len(group_codes):
+        return []
+    order = np.argsort(group_codes, kind='stable')
+    bounds = np.cumsum(np.bincount(group_codes))[:-1]
+    return [
+        group_values.tolist()
+        for group_values in np.split(values[order], bounds)
+    ]
 
 
+@instrumented
 def arrange_information_in_dict(general_ms, profile_ms):
     """
     This function gets the tuple general_ms and the tuple profile_ms and then
@@ -418,7 +1731,6 @@ def arrange_information_in_dict(general_ms, profile_ms):
         Dictionary with the resumed information.
 
     """
-    tick = perf_counter()
     logging.info('Arranging information.')
     info_series_movies = {'general': {}}
     sub_names = ['movie', 'series', 'movie_info', 'series_info']
@@ -431,14 +1743,10 @@ def arrange_information_in_dict(general_ms, profile_ms):
             info_series_movies[f'profile_{profile_num}'][sub_dataset] = \
                 profile_ms[profile_num][index]
     logging.info(f'General keys: {info_series_movies.keys()}')
-    tock = perf_counter()
-    time_it_took = tock-tick
-    logging.info(
-        f'Arranging information took {time_it_took} seconds.'
-    )
     return info_series_movies
 
 
+@instrumented
 def save_dict_data(dict_data, path='./'):
     """
     Function to save each dataframe from the dictionary that comes from the
@@ -454,72 +1762,190 @@ def save_dict_data(dict_data, path='./'):
 
     Returns
     -------
-    None
+    saved_files: list
+        Paths of the saved files.
 
     """
-    tick = perf_counter()
     logging.info('Saving info...')
+    saved_files = []
     for key in dict_data.keys():
         for info in dict_data[key].keys():
             data = dict_data[key][info]
-            save_data(
+            saved_file = save_data(
                 data=data,
                 path=path,
                 name=f'{key}_{info}'
             )
+            saved_files.append(saved_file)
 
-    tock = perf_counter()
-    time_it_took = tock-tick
-    logging.info(f'Saving information took {time_it_took} seconds.')
+    return saved_files
 
 
 def save_data(data, path='./', name='untitled'):
     """
-    Function used to save data as a csv given the path and the file's name.
+    Function used to save data as a parquet file given the path and the
+     file's name. Parquet keeps the datetime and list columns typed, so they
+     do not need to be parsed again when the data is read.
 
     Parameters
     ----------
     data: pd.DataFrame
         Desired dataframe to be saved.
     path: str
-        Path where the csv must be located.
+        Path where the parquet file must be located.
     name: str
         Name of the final file.
 
     Returns
     -------
-    None
+    final_name: str
+        Path of the saved file.
 
     """
-    final_name = f'{path}/{name}.csv'
-    data.to_csv(final_name, index=False)
-    logging.info(f'File {name}.csv saved into {path}...')
+    final_name = f'{path}/{name}.{INTERIM_FORMAT}'
+    data.to_parquet(final_name, index=False)
+    logging.info(f'File {name}.{INTERIM_FORMAT} saved into {path}...')
+    return final_name
 
 
-def process():
-    tick = perf_counter()
+@instrumented
+def process(data_path=None, interim_data_path=None, chunksize=None,
+            force=False, incremental=False):
+    """
+    Main process function. The process is skipped if the netflix data did
+     not change since the last time it was processed with the same
+     parameters.
+
+    Parameters
+    ----------
+    data_path: str
+        Path of the raw netflix data: the zip file given by netflix (the
+         ViewingActivity.csv file is read directly from it, see
+         initial_data_unzip_extraction.open_raw_data) or the extracted csv
+         file. data/raw/netflix-report.zip by default.
+    interim_data_path: str
+        Folder where the processed data is saved, data/interim by default.
+    chunksize: int
+        If given, the netflix data is read, processed and summarised in
+         chunks of this number of rows (see stream_netflix_data and
+         stream_movie_and_series_information), useful when the file does not
+         fit in memory. The incremental process still keeps all the netflix
+         data in memory.
+    force: bool
+        If True the process is done even if it is cached.
+    incremental: bool
+        If True only the rows newer than the last ingested start_time of each
+         profile are processed and merged into the interim data (netflix
+         exports are cumulative). If there is no valid previous ingestion
+         everything is processed.
+
+    Returns
+    -------
+    outputs: dict
+        The processed netflix data and the series information of profile_0,
+         so they can be given directly to the visualization process (empty if
+         the process was skipped or the data was processed in chunks, the
+         visualization then reads them from the interim data).
+    """
     general_path = os.path.join(os.path.dirname(__file__), '..', '..')
-    data_path = os.path.join(general_path, 'data')
-    interim_data_path = os.path.join(data_path, 'interim')
-    raw_data_path = os.path.join(data_path, 'raw')
-    raw_folder = os.path.join(raw_data_path, 'netflix-report')
-    interest_data_file = os.path.join(
-        raw_folder,
-        'CONTENT_INTERACTION/ViewingActivity.csv'
-    )
-    netflix_data = get_netflix_data(interest_data_file)
-    general_ms_information = movie_and_series_information(netflix_data)
-    profile_ms_information = netflix_data.groupby('profile_name').apply(
-        movie_and_series_information
-    )
-    ms_information = arrange_information_in_dict(
-        general_ms_information, profile_ms_information
-    )
-    save_data(data=netflix_data, path=interim_data_path, name='netflix_data')
-    save_dict_data(dict_data=ms_information, path=interim_data_path)
-    tock = perf_counter()
-    time_it_took = tock-tick
-    logging.info(f'Process took {time_it_took} seconds.')
+    interest_data_file = data_path or os.path.join(
+        general_path, 'data/raw/netflix-report.zip'
+    )
+    interim_data_path = interim_data_path or os.path.join(
+        general_path, 'data/interim'
+    )
+    os.makedirs(interim_data_path, exist_ok=True)
+    cache_path = os.path.join(interim_data_path, 'stage_cache')
+    netflix_data_file = os.path.join(
+        interim_data_path, f'netflix_data.{INTERIM_FORMAT}'
+    )
+    watermark_file = os.path.join(interim_data_path, 'netflix_watermark.json')
+    fingerprint = get_stage_fingerprint(
+        inputs=[
+            __file__,
+            fetch_information.__file__,
+            initial_data_unzip_extraction.__file__,
+            schema.__file__,
+        ],
+        params={
+            'data': get_raw_data_fingerprint(interest_data_file),
+            'chunksize': chunksize,
+            'incremental': incremental,
+        },
+    )
+    if not force and is_stage_cached(STAGE_NAME, fingerprint, cache_path):
+        return {}
+    profiles_dict = get_profiles_dict_from_chunks(
+        interest_data_file, chunksize=chunksize or CHUNKSIZE
+    )
+    watermark = None
+    if incremental and os.path.exists(netflix_data_file):
+        watermark = load_watermark(watermark_file, profiles_dict)
+    if watermark is not None:
+        new_netflix_data, profiles = get_new_netflix_data(
+            interest_data_file,
+            watermark,
+            profiles_dict,
+            chunksize=chunksize or CHUNKSIZE,
+        )
+        netflix_data = merge_netflix_data(
+            new_netflix_data, read_interim_data(netflix_data_file), profiles
+        )
+        save_data(
+            data=netflix_data, path=interim_data_path, name='netflix_data'
+        )
+        ms_information = update_information(
+            netflix_data, new_netflix_data, interim_data_path
+        )
+    elif chunksize:
+        stream_netflix_data(
+            interest_data_file,
+            netflix_data_file,
+            chunksize=chunksize,
+            profiles_dict=profiles_dict,
+        )
+        saved_files, last_start_times = stream_movie_and_series_information(
+            netflix_data_file, interim_data_path, chunksize=chunksize
+        )
+        save_watermark(last_start_times, profiles_dict, watermark_file)
+        save_stage_fingerprint(
+            STAGE_NAME,
+            fingerprint,
+            [netflix_data_file, watermark_file] + saved_files,
+            cache_path,
+        )
+        # The data is not kept in memory, the visualization process reads
+        # what it needs from the interim data.
+        return {}
+    else:
+        netflix_data = get_netflix_data(interest_data_file, profiles_dict)
+        save_data(
+            data=netflix_data, path=interim_data_path, name='netflix_data'
+        )
+        general_ms_information, profile_ms_information = \
+            movie_and_series_information_by_profile(netflix_data)
+        ms_information = arrange_information_in_dict(
+            general_ms_information, profile_ms_information
+        )
+    saved_files = save_dict_data(
+        dict_data=ms_information, path=interim_data_path
+    )
+    save_watermark(
+        netflix_data.groupby('profile_name', observed=True).start_time.max(),
+        profiles_dict,
+        watermark_file,
+    )
+    save_stage_fingerprint(
+        STAGE_NAME,
+        fingerprint,
+        [netflix_data_file, watermark_file] + saved_files,
+        cache_path,
+    )
+    outputs = {
+        'netflix_data': netflix_data,
+        'series_info': ms_information['profile_0']['series_info'],
+    }
+    return outputs
 
 
 if __name__ == "__main__":
@@ -0,0 +1,178 @@
+import csv
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pcsv
+
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Columns of the ViewingActivity.csv file given by netflix and their types.
+RAW_SCHEMA = {
+    'Profile Name': 'category',
+    'Start Time': 'datetime',
+    'Duration': 'string',
+    'Attributes': 'category',
+    'Title': 'category',
+    'Supplemental Video Type': 'category',
+    'Device Type': 'category',
+    'Bookmark': 'string',
+    'Latest Bookmark': 'string',
+    'Country': 'category',
+}
+# Columns of the processed netflix data (netflix_data in the interim data)
+# and their types.
+INTERIM_SCHEMA = {
+    'profile_name': 'category',
+    'start_time': 'datetime',
+    'duration': 'float',
+    'title': 'category',
+    'device_type': 'category',
+    'bookmark': 'string',
+    'latest_bookmark': 'string',
+    'country': 'category',
+    'end_time': 'datetime',
+    'new_title': 'category',
+    'is_serie': 'bool',
+}
+PANDAS_DTYPES = {
+    'category': 'category',
+    'string': 'object',
+    'float': 'float64',
+    'bool': 'bool',
+}
+ARROW_TYPES = {
+    'category': pa.dictionary(pa.int32(), pa.string()),
+    'string': pa.string(),
+    'datetime': pa.timestamp('ns'),
+    'float': pa.float64(),
+    'bool': pa.bool_(),
+}
+
+
+def get_schema_columns(schema, columns=None):
+    """
+    Get the part of a schema of the given columns.
+
+    Parameters
+    ----------
+    schema: dict
+        Mapping from each column to its type.
+    columns: list
+        Columns to keep, if not given every column of the schema is kept.
+
+    Returns
+    -------
+    schema: dict
+        Mapping from each kept column to its type.
+    """
+    if columns is None:
+        return schema
+    return {col: schema[col] for col in columns if col in schema}
+
+
+def check_csv_columns(file, schema):
+    """
+    Checks that the header of a csv file has every column of a schema, so a
+     file that is not a netflix export fails with a clear message. File
+     objects are read back to their initial position.
+
+    Parameters
+    ----------
+    file: str or file object
+        Path or binary file of the csv file.
+    schema: dict
+        Mapping from each column to its type.
+
+    Returns
+    -------
+    None
+    """
+    if isinstance(file, str):
+        with open(file, 'rb') as csv_file:
+            header = csv_file.readline()
+    else:
+        position = file.tell()
+        header = file.readline()
+        file.seek(position)
+    file_columns = next(csv.reader([header.decode('utf-8-sig')]), [])
+    missing_columns = [col for col in schema if col not in file_columns]
+    if missing_columns:
+        raise ValueError(
+            f'The csv file does not have the columns {missing_columns}.'
+        )
+
+
+def read_csv(file, schema, columns=None):
+    """
+    Reads a whole csv file with the types of a schema. The file is parsed by
+     the multithreaded pyarrow reader, datetimes are parsed with
+     DATETIME_FORMAT and the columns that are not read are never converted.
+
+    Parameters
+    ----------
+    file: str or file object
+        Path or binary file (see initial_data_unzip_extraction.open_raw_data)
+         of the csv file.
+    schema: dict
+        Mapping from each column to its type.
+    columns: list
+        Columns to read, if not given every column of the schema is read.
+
+    Returns
+    -------
+    data: pd.DataFrame
+        Data of the file with the types of the schema.
+    """
+    schema = get_schema_columns(schema, columns)
+    check_csv_columns(file, schema)
+    table = pcsv.read_csv(
+        file,
+        read_options=pcsv.ReadOptions(use_threads=True),
+        convert_options=pcsv.ConvertOptions(
+            column_types={
+                col: ARROW_TYPES[col_type] for col, col_type in schema.items()
+            },
+            include_columns=list(schema),
+            timestamp_parsers=[DATETIME_FORMAT],
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas()
+
+
+def read_csv_chunks(file, schema, chunksize, columns=None):
+    """
+    Reads a csv file by chunks with the types of a schema (datetimes are
+     parsed with DATETIME_FORMAT).
+
+    Parameters
+    ----------
+    file: str or file object
+        Path or binary file of the csv file.
+    schema: dict
+        Mapping from each column to its type.
+    chunksize: int
+        Number of rows of each chunk.
+    columns: list
+        Columns to read, if not given every column of the schema is read.
+
+    Yields
+    ------
+    chunk: pd.DataFrame
+        Data of the chunk with the types of the schema.
+    """
+    schema = get_schema_columns(schema, columns)
+    check_csv_columns(file, schema)
+    chunks = pd.read_csv(
+        file,
+        usecols=list(schema),
+        dtype={
+            col: PANDAS_DTYPES[col_type] for col, col_type in schema.items()
+            if col_type in PANDAS_DTYPES
+        },
+        chunksize=chunksize,
+    )
+    for chunk in chunks:
+        for col, col_type in schema.items():
+            if col_type == 'datetime':
+                chunk[col] = pd.to_datetime(chunk[col], format=DATETIME_FORMAT)
+        yield chunk
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import os
+
+
+BLOCK_SIZE = 2 ** 20
+
+
+def get_file_fingerprint(path):
+    """
+    Get a fingerprint of the content of a file (or of every file inside a
+     folder).
+
+    Parameters
+    ----------
+    path: str
+        Path of the file or folder.
+
+    Returns
+    -------
+    fingerprint: str
+        sha256 hexdigest of the content.
+
+    """
+    file_hash = hashlib.sha256()
+    if os.path.isdir(path):
+        for root, _, files in sorted(os.walk(path)):
+            for file_name in sorted(files):
+                file_path = os.path.join(root, file_name)
+                file_hash.update(os.path.relpath(file_path, path).encode())
+                file_hash.update(get_file_fingerprint(file_path).encode())
+        return file_hash.hexdigest()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(BLOCK_SIZE), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def get_stage_fingerprint(inputs, params=None):
+    """
+    Get a fingerprint of a stage from the content of its inputs and its
+     parameters. If any of them changes, the fingerprint changes.
+
+    Parameters
+    ----------
+    inputs: list
+        Paths of the files (data and code) the stage depends on.
+    params: dict
+        Parameters of the stage, they must be json serializable.
+
+    Returns
+    -------
+    fingerprint: str
+        sha256 hexdigest of the inputs and the parameters.
+
+    """
+    stage_hash = hashlib.sha256()
+    for input_path in inputs:
+        stage_hash.update(get_file_fingerprint(input_path).encode())
+    stage_hash.update(
+        json.dumps(params or {}, sort_keys=True, default=str).encode()
+    )
+    return stage_hash.hexdigest()
+
+
+def get_manifest_path(stage_name, cache_path):
+    """
+    Get the path of the file where the fingerprint of a stage is recorded.
+
+    Parameters
+    ----------
+    stage_name: str
+        Name of the stage.
+    cache_path: str
+        Folder where the fingerprints are recorded.
+
+    Returns
+    -------
+    manifest_path: str
+        Path of the json file of the stage.
+
+    """
+    return os.path.join(cache_path, f'{stage_name}.json')
+
+
+def is_stage_cached(stage_name, fingerprint, cache_path):
+    """
+    Checks if a stage already ran with the same fingerprint and all of the
+     outputs it recorded still exist, so it can be skipped.
+
+    Parameters
+    ----------
+    stage_name: str
+        Name of the stage.
+    fingerprint: str
+        Current fingerprint of the stage (see get_stage_fingerprint).
+    cache_path: str
+        Folder where the fingerprints are recorded.
+
+    Returns
+    -------
+    cached: bool
+        True if the stage can be skipped.
+
+    """
+    manifest_path = get_manifest_path(stage_name, cache_path)
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path) as manifest_file:
+        manifest = json.load(manifest_file)
+    if manifest.get('fingerprint') != fingerprint:
+        logging.info(f'Inputs of stage {stage_name} changed.')
+        return False
+    missing_outputs = [
+        output for output in manifest.get('outputs', [])
+        if not os.path.exists(output)
+    ]
+    if missing_outputs:
+        logging.info(f'Stage {stage_name} is missing: {missing_outputs}.')
+        return False
+    logging.info(f'Stage {stage_name} is cached, skipping it.')
+    return True
+
+
+def save_stage_fingerprint(stage_name, fingerprint, outputs, cache_path):
+    """
+    Records the fingerprint of a stage that just ran and its outputs.
+
+    Parameters
+    ----------
+    stage_name: str
+        Name of the stage.
+    fingerprint: str
+        Fingerprint of the stage (see get_stage_fingerprint).
+    outputs: list
+        Paths of the files written by the stage.
+    cache_path: str
+        Folder where the fingerprints are recorded.
+
+    Returns
+    -------
+    None
+
+    """
+    os.makedirs(cache_path, exist_ok=True)
+    manifest = {
+        'fingerprint': fingerprint,
+        'outputs': [os.path.abspath(output) for output in outputs],
+    }
+    with open(get_manifest_path(stage_name, cache_path), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=4)
+    logging.info(f'Fingerprint of stage {stage_name} saved.')
@@ -0,0 +1,382 @@
+import cProfile
+import functools
+import json
+import logging
+import os
+import pstats
+import sys
+import tracemalloc
+
+from contextlib import contextmanager
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:  # resource is not available on windows.
+    resource = None
+
+
+PROFILE_TOP_FUNCTIONS = 25
+TRACEMALLOC_TOP_LINES = 10
+BYTES_IN_MB = 1024 ** 2
+SAMPLE_SIZE = 5
+
+settings = {'profile': False, 'trace_memory': False}
+spans = {}
+stages = []
+counters = {}
+
+
+def configure(profile=False, trace_memory=False):
+    """
+    Configures the optional (and expensive) captures of each stage and
+     clears the metrics of previous runs.
+
+    Parameters
+    ----------
+    profile: bool
+        If True each stage runs under cProfile and its slowest functions are
+         added to the summary.
+    trace_memory: bool
+        If True each stage runs under tracemalloc and its peak python memory
+         and largest allocations are added to the summary.
+
+    Returns
+    -------
+    None
+    """
+    settings['profile'] = profile
+    settings['trace_memory'] = trace_memory
+    spans.clear()
+    stages.clear()
+    counters.clear()
+
+
+def reset_peak_memory():
+    """
+    Resets the peak resident memory of the process so the peak of the next
+     stage can be measured on its own (only possible on linux, elsewhere the
+     peak of the whole process so far is reported).
+
+    Returns
+    -------
+    None
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        pass
+
+
+def get_peak_memory_mb():
+    """
+    Get the peak resident memory used by the process since the last call to
+     reset_peak_memory.
+
+    Returns
+    -------
+    peak_memory: float
+        Peak resident memory in MB (None if it can not be measured).
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # macOS reports bytes instead of kilobytes.
+        peak_memory /= 1024
+    return round(peak_memory / 1024, 1)
+
+
+def get_rows(data):
+    """
+    Get the number of rows of a dataframe.
+
+    Parameters
+    ----------
+    data:
+        Any object.
+
+    Returns
+    -------
+    rows: int
+        Number of rows (None if data is not a dataframe).
+    """
+    if hasattr(data, 'columns') and hasattr(data, 'index'):
+        return len(data)
+    return None
+
+
+def add_span(name, seconds, rows_in=None, rows_out=None):
+    """
+    Adds a measure to the aggregated metrics of a span. Spans that run many
+     times only keep their number of calls, total and maximum time and total
+     rows.
+
+    Parameters
+    ----------
+    name: str
+        Name of the span.
+    seconds: float
+        Time it took.
+    rows_in: int
+        Number of rows it received.
+    rows_out: int
+        Number of rows it returned.
+
+    Returns
+    -------
+    None
+    """
+    metrics = spans.setdefault(name, {
+        'calls': 0,
+        'total_time': 0.0,
+        'max_time': 0.0,
+        'rows_in': None,
+        'rows_out': None,
+    })
+    metrics['calls'] += 1
+    metrics['total_time'] += seconds
+    metrics['max_time'] = max(metrics['max_time'], seconds)
+    if rows_in is not None:
+        metrics['rows_in'] = (metrics['rows_in'] or 0) + rows_in
+    if rows_out is not None:
+        metrics['rows_out'] = (metrics['rows_out'] or 0) + rows_out
+    logging.debug('%s took %.4f seconds.', name, seconds)
+
+
+def count(name, amount=1):
+    """
+    Adds to an aggregated counter of the run. Counters replace the logs of
+     per-row and per-group paths: they are called once per column or group
+     operation and only their totals are reported (see get_summary).
+
+    Parameters
+    ----------
+    name: str
+        Name of the counter.
+    amount: int
+        Amount added to the counter.
+
+    Returns
+    -------
+    None
+    """
+    counters[name] = counters.get(name, 0) + int(amount)
+
+
+def log_sample(message, values):
+    """
+    Logs a few of the given values at debug level. Nothing is formatted
+     unless the verbose mode (debug level) is enabled.
+
+    Parameters
+    ----------
+    message: str
+        Message with a single %s placeholder for the values.
+    values: pd.Series
+        Values from which the sample is taken.
+
+    Returns
+    -------
+    None
+    """
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(message, values.head(SAMPLE_SIZE).tolist())
+
+
+@contextmanager
+def span(name, rows_in=None):
+    """
+    Context manager that measures the time of a block of code. The number of
+     rows it returns can be given by setting 'rows_out' in the yielded dict.
+
+    Parameters
+    ----------
+    name: str
+        Name of the span.
+    rows_in: int
+        Number of rows the block receives.
+
+    Yields
+    ------
+    record: dict
+        Dictionary where rows_out can be set.
+    """
+    record = {'rows_in': rows_in, 'rows_out': None}
+    tick = perf_counter()
+    try:
+        yield record
+    finally:
+        tock = perf_counter()
+        add_span(name, tock - tick, record['rows_in'], record['rows_out'])
+
+
+def instrumented(function):
+    """
+    Decorator that measures each call of a function as a span named after
+     its module and name. The rows of the first argument and of the returned
+     value are counted when they are dataframes.
+
+    Parameters
+    ----------
+    function: callable
+        Function to measure.
+
+    Returns
+    -------
+    wrapper: callable
+        The measured function.
+    """
+    name = f'{function.__module__.split(".")[-1]}.{function.__name__}'
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        rows_in = get_rows(args[0]) if args else None
+        with span(name, rows_in) as record:
+            result = function(*args, **kwargs)
+            record['rows_out'] = get_rows(result)
+        return result
+    return wrapper
+
+
+def get_profile_summary(profiler):
+    """
+    Get the functions where a profiled stage spent most of its time.
+
+    Parameters
+    ----------
+    profiler: cProfile.Profile
+        Profiler of the stage.
+
+    Returns
+    -------
+    profile_summary: list
+        Calls, own time and cumulative time of the slowest functions.
+    """
+    profile_stats = pstats.Stats(profiler).stats
+    slowest = sorted(
+        profile_stats.items(), key=lambda item: item[1][3], reverse=True,
+    )[:PROFILE_TOP_FUNCTIONS]
+    profile_summary = [
+        {
+            'function': f'{file_name}:{line}({function_name})',
+            'calls': calls,
+            'total_time': round(total_time, 4),
+            'cumulative_time': round(cumulative_time, 4),
+        }
+        for (file_name, line, function_name),
+            (_, calls, total_time, cumulative_time, _)
+        in slowest
+    ]
+    return profile_summary
+
+
+@contextmanager
+def stage(name):
+    """
+    Context manager that measures a stage of the pipeline: its wall time,
+     its peak resident memory and, if they are configured, its cProfile and
+     tracemalloc captures.
+
+    Parameters
+    ----------
+    name: str
+        Name of the stage.
+
+    Yields
+    ------
+    stage_stats: dict
+        Metrics of the stage (filled when the stage finishes).
+    """
+    stage_stats = {'stage': name}
+    profiler = cProfile.Profile() if settings['profile'] else None
+    trace_memory = settings['trace_memory'] and not tracemalloc.is_tracing()
+    reset_peak_memory()
+    if trace_memory:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    tick = perf_counter()
+    try:
+        yield stage_stats
+    finally:
+        tock = perf_counter()
+        if profiler:
+            profiler.disable()
+            stage_stats['profile'] = get_profile_summary(profiler)
+        if trace_memory:
+            _, python_peak = tracemalloc.get_traced_memory()
+            statistics = tracemalloc.take_snapshot().statistics('lineno')
+            tracemalloc.stop()
+            stage_stats['python_peak_memory_mb'] = round(
+                python_peak / BYTES_IN_MB, 1
+            )
+            stage_stats['top_allocations'] = [
+                {
+                    'line': str(statistic.traceback[0]),
+                    'size_mb': round(statistic.size / BYTES_IN_MB, 3),
+                }
+                for statistic in statistics[:TRACEMALLOC_TOP_LINES]
+            ]
+        stage_stats['wall_time'] = tock - tick
+        stage_stats['peak_memory_mb'] = get_peak_memory_mb()
+        stages.append(stage_stats)
+        logging.info(
+            f'Stage {name} took {stage_stats["wall_time"]:.2f} seconds '
+            f'(peak memory: {stage_stats["peak_memory_mb"]} MB).'
+        )
+
+
+def get_summary():
+    """
+    Get the aggregated metrics of the run: the metrics of each stage and of
+     each span and the counters.
+
+    Returns
+    -------
+    summary: dict
+        Metrics of the run.
+    """
+    summary = {
+        'total_time': sum(stats['wall_time'] for stats in stages),
+        'stages': stages,
+        'spans': dict(sorted(
+            spans.items(),
+            key=lambda item: item[1]['total_time'],
+            reverse=True,
+        )),
+        'counters': counters,
+    }
+    return summary
+
+
+def save_summary(path):
+    """
+    Saves the aggregated metrics of the run in a json file.
+
+    Parameters
+    ----------
+    path: str
+        Path of the json file.
+
+    Returns
+    -------
+    summary: dict
+        Metrics of the run.
+    """
+    summary = get_summary()
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, 'w') as summary_file:
+        json.dump(summary, summary_file, indent=4, default=str)
+    logging.info(f'Metrics of the run saved into {path}.')
+    return summary
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+def get_gap_clusters(values, eps, groups=None):
+    """
+    Clusters one dimensional values: the values are sorted and split
+     wherever the gap between two consecutive values is greater than eps.
+     This gives the same labels as DBSCAN(eps=eps, min_samples=1), where
+     the clusters are numbered in the order in which they first appear in
+     values, in O(n log n) time.
+
+    Parameters
+    ----------
+    values: np.ndarray
+        Values to cluster.
+    eps: float
+        Maximum gap between two consecutive values of the same cluster.
+    groups: np.ndarray
+        If given, group of each value (for example the series it belongs
+         to). Each group is clustered on its own and its labels start at 0,
+         so many groups can be clustered at once.
+
+    Returns
+    -------
+    labels: np.ndarray
+        Cluster of each value.
+    """
+    values = np.asarray(values, dtype=float)
+    if groups is None:
+        groups = np.zeros(len(values), dtype=int)
+    groups = np.asarray(groups)
+    if not len(values):
+        return np.zeros(0, dtype=int)
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    sorted_groups = groups[order]
+    new_cluster = np.empty(len(values), dtype=bool)
+    new_cluster[0] = True
+    new_cluster[1:] = (
+        (np.diff(sorted_values) > eps)
+        | (sorted_groups[1:] != sorted_groups[:-1])
+    )
+    clusters = np.empty(len(values), dtype=int)
+    clusters[order] = np.cumsum(new_cluster) - 1
+
+    # Clusters are numbered by their first appearance inside their group.
+    _, first_positions = np.unique(clusters, return_index=True)
+    cluster_groups = groups[first_positions]
+    cluster_order = np.lexsort((first_positions, cluster_groups))
+    sorted_cluster_groups = cluster_groups[cluster_order]
+    group_starts = np.flatnonzero(np.r_[
+        True, sorted_cluster_groups[1:] != sorted_cluster_groups[:-1]
+    ])
+    group_sizes = np.diff(np.r_[group_starts, len(cluster_order)])
+    cluster_labels = np.empty(len(cluster_order), dtype=int)
+    cluster_labels[cluster_order] = (
+        np.arange(len(cluster_order)) - np.repeat(group_starts, group_sizes)
+    )
+    labels = cluster_labels[clusters]
+    return labels
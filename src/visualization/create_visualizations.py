@@ -1,32 +1,52 @@
 import datetime
-import glob
 import logging
-import matplotlib as mpl
-import matplotlib.pyplot as plt
 import numpy as np
 import os
 import pandas as pd
-import seaborn as sns
 import warnings
 
 from ast import literal_eval
-from PIL import Image
-from PyPDF2 import PdfMerger
-from sklearn.cluster import DBSCAN
-from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
 
+from src.data import fetch_information, schema
 from src.data.fetch_information import (
+    get_duration_in_hours,
     get_processed_netflix_data,
     get_general_sorted_data,
+    sort_and_limit_data,
 )
+from src.data.stage_cache import (
+    get_stage_fingerprint,
+    is_stage_cached,
+    save_stage_fingerprint,
+)
+from src.instrumentation import instrumented
+from src.visualization import (
+    clustering,
+    frame_sink,
+    report_sink,
+    utils as visualization_utils,
+)
+from src.visualization.clustering import get_gap_clusters
 from src.visualization.utils import (
     get_pivoted_data,
     clean_text,
     create_calendar_pivot_table,
     colorfunc,
     create_folder,
-    delete_folder
+    get_daily_data,
 )
+from src.visualization.frame_sink import save_gif
+from src.visualization.report_sink import finish_figure, save_report
+
+
+# The plotting libraries (matplotlib, seaborn and PIL) take most of
+# the import time of this module, so they are imported by the functions that
+# use them (see benchmarks/import_budget.py).
+STAGE_NAME = 'create_visualizations'
+STACKED_DURATION_FILE = 'img0_netflix_duracion_fecha_perfil.pdf'
+STACKED_PROPORTION_FILE = 'img1_netflix_proporcion_fecha_perfil.pdf'
+TOTAL_TIME_ANIMATION_FILE = 'image.gif'
 
 
 def initialize_configuration():
@@ -43,18 +63,161 @@ def initialize_configuration():
          different tones).
 
     """
+    from matplotlib.colors import LinearSegmentedColormap
+
     logging.info('Initializing configuration')
     warnings.filterwarnings("ignore")
     logging.info('Ignoring warinigs.')
     colorlist = ['red', 'black']
-    colormap = mpl.colors.LinearSegmentedColormap.from_list(
+    colormap = LinearSegmentedColormap.from_list(
         "", colorlist
     ).resampled(100)
     logging.info(f'Colormap uses colrlist: {colorlist}.')
     return colormap
 
 
-def get_stacked_profile_duration(netflix_data, image_path='./', cmap=None):
+def initialize_render_worker():
+    """
+    Configures a process that renders figures: it uses the non-interactive
+     Agg backend (no display is needed) and ignores warnings.
+
+    Returns
+    -------
+    None
+    """
+    import matplotlib.pyplot as plt
+
+    plt.switch_backend('Agg')
+    warnings.filterwarnings("ignore")
+
+
+def get_series_file_name(series_title):
+    """
+    Get the name of the file of the plot of a series (see plot_series_time).
+
+    Parameters
+    ----------
+    series_title: str
+        Title of the series.
+
+    Returns
+    -------
+    file_name: str
+        Name of the pdf file.
+    """
+    return f'img2_series__{clean_text(series_title)}.pdf'
+
+
+def get_calendar_file_names(filter_profile_name=''):
+    """
+    Get the names of the files of a calendar-like plot and of its animation
+     (see generate_calendarlike_plot).
+
+    Parameters
+    ----------
+    filter_profile_name: str
+        Profile of the plot, if empty the plot is of every profile.
+
+    Returns
+    -------
+    file_name: str
+        Name of the pdf file.
+    animation_name: str
+        Name of the gif file (inside the animations folder).
+    """
+    suffix = f'__{filter_profile_name}' if filter_profile_name else ''
+    file_name = f'img3_netflix_horas_mes_anio{suffix}.pdf'
+    animation_name = f'heatmap{suffix}.gif'
+    return file_name, animation_name
+
+
+def get_output_paths(report_path, series_titles, profiles, save_figures=True):
+    """
+    Get the paths of every file written by the process: the report, the
+     animations and, if they are saved, the files of the figures.
+
+    Parameters
+    ----------
+    report_path: str
+        Folder of the report (with the figures in its figures folder).
+    series_titles: list
+        Titles of the plotted series.
+    profiles: list
+        Profiles with their own calendar-like plot.
+    save_figures: bool
+        If True the files of the figures are included.
+
+    Returns
+    -------
+    output_paths: list
+        Paths of the files.
+    """
+    images_data_path = os.path.join(report_path, 'figures')
+    animation_path = os.path.join(images_data_path, 'animations')
+    figure_names = [STACKED_DURATION_FILE, STACKED_PROPORTION_FILE] + [
+        get_series_file_name(series_title) for series_title in series_titles
+    ]
+    animation_names = [TOTAL_TIME_ANIMATION_FILE]
+    for profile in [''] + list(profiles):
+        file_name, animation_name = get_calendar_file_names(profile)
+        figure_names.append(file_name)
+        animation_names.append(animation_name)
+    output_paths = [os.path.join(report_path, 'report.pdf')] + [
+        os.path.join(animation_path, animation_name)
+        for animation_name in animation_names
+    ]
+    if save_figures:
+        output_paths += [
+            os.path.join(images_data_path, file_name)
+            for file_name in figure_names
+        ]
+    return output_paths
+
+
+def render_figures(render_tasks, workers=1):
+    """
+    Renders independent figures and yields the result of each task in the
+     order of render_tasks, so the report pages are always in the same order.
+     The tasks can be rendered at the same time in a pool of processes.
+
+    Parameters
+    ----------
+    render_tasks: list
+        List of tuples (function, args, kwargs) where each function renders
+         its figures and returns the figure of the report (or None).
+    workers: int
+        Number of processes used to render the figures. With 1 the figures
+         are rendered one after another in this process (each one when it is
+         requested) and with 0 every available core is used.
+
+    Yields
+    ------
+    fig: matplotlib.figure.Figure
+        Result of each task.
+    """
+    if workers == 0:
+        workers = os.cpu_count()
+    if workers <= 1:
+        for function, args, kwargs in render_tasks:
+            yield function(*args, **kwargs)
+    else:
+        logging.info(f'Rendering figures with {workers} processes.')
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=initialize_render_worker,
+        ) as executor:
+            futures = [
+                executor.submit(function, *args, **kwargs)
+                for function, args, kwargs in render_tasks
+            ]
+            for future in futures:
+                # Raises the exception of a failed task.
+                yield future.result()
+
+
+@instrumented
+def get_stacked_profile_duration(netflix_data, image_path='./', cmap=None,
+                                 save_file=True, report=False):
     """
     This functions generates a stacked plot over time with the proportion of
      time spent by each profile of the same account. The values are grouped
@@ -67,16 +230,24 @@ def get_stacked_profile_duration(netflix_data, image_path='./', cmap=None):
     ----------
     netflix_data: pd.DataFrame
         Processed netflix data obtained from the get_processed_netflix_data
-         function.
+         function (or its daily aggregation obtained from get_daily_data).
     image_path: str
         String of the path where the images will be saved in.
     cmap: matplotlib.colors.LinearSegmentedColormap
         Desired colormap.
+    save_file: bool
+        If True the figure is saved in its own pdf file in image_path.
+    report: bool
+        If True the figure is returned (not closed) so it can be written into
+         the report (see report_sink.save_report).
 
     Returns
     -------
-    None
+    fig: matplotlib.figure.Figure
+        The figure if report is True, None otherwise.
     """
+    import matplotlib.pyplot as plt
+
     logging.info('Getting stacked profile duration file.')
     pivoted_data = get_pivoted_data(netflix_data)
     pivoted_data_filtered = pivoted_data[
@@ -99,14 +270,13 @@ def get_stacked_profile_duration(netflix_data, image_path='./', cmap=None):
     plt.title(title_str)
     plt.legend(bbox_to_anchor=(1.15, 0.5), loc="center right")
     plt.grid(linestyle='--')
-    plt.savefig(
-        f'{image_path}img0_netflix_duracion_fecha_perfil.pdf',
-        bbox_inches='tight'
-    )
-    plt.close()
+    save_name = f'{image_path}{STACKED_DURATION_FILE}'
+    return finish_figure(plt.gcf(), save_name if save_file else None, report)
 
 
-def get_stacked_profile_proportion(netflix_data, image_path='./', cmap=None):
+@instrumented
+def get_stacked_profile_proportion(netflix_data, image_path='./', cmap=None,
+                                   save_file=True, report=False):
     """
     This functions generates a stacked plot over time with the duration of time
      spent by each profile of the same account. The values are grouped each
@@ -116,16 +286,24 @@ def get_stacked_profile_proportion(netflix_data, image_path='./', cmap=None):
     ----------
     netflix_data: pd.DataFrame
         Processed netflix data obtained from the get_processed_netflix_data
-         function.
+         function (or its daily aggregation obtained from get_daily_data).
     image_path: str
         String of the path where the images will be saved in.
     cmap: matplotlib.colors.LinearSegmentedColormap
         Desired colormap.
+    save_file: bool
+        If True the figure is saved in its own pdf file in image_path.
+    report: bool
+        If True the figure is returned (not closed) so it can be written into
+         the report (see report_sink.save_report).
 
     Returns
     -------
-    None
+    fig: matplotlib.figure.Figure
+        The figure if report is True, None otherwise.
     """
+    import matplotlib.pyplot as plt
+
     logging.info('Getting stacked profile proportion file.')
     pivoted_data = get_pivoted_data(netflix_data)
     pivoted_data_filtered = pivoted_data[
@@ -152,23 +330,21 @@ def get_stacked_profile_proportion(netflix_data, image_path='./', cmap=None):
     title_str = 'Proporción de tiempo en netflix para cada perfil.'
     plt.title(title_str)
     plt.legend(bbox_to_anchor=(1.15, 0.5), loc="center right")
-    save_name = f'{image_path}img1_netflix_proporcion_fecha_perfil.pdf'
-    plt.savefig(
-        save_name,
-        bbox_inches='tight'
-    )
-    logging.info(f'Saving plot into {save_name}')
-    plt.close()
+    save_name = f'{image_path}{STACKED_PROPORTION_FILE}'
+    return finish_figure(plt.gcf(), save_name if save_file else None, report)
 
 
-def plot_series_time(series_data_row, image_path='./', cmap=None):
+@instrumented
+def plot_series_time(series_data_row, image_path='./', cmap=None,
+                     save_file=True, report=False):
     """
     This function plots a series over time (just like a time series, no pun
      intended) where the x_axis is the starting point and the y axis is the
      time of the day the series was watched. It also uses the colormap to
      identify if the data points are too sepparated or too close together. This
-     is done through an Unsupervised machine learning model called DBSCAN.
-     The sepparation of clusters is 48 hours (2 days).
+     is done by clustering the days in which the series was watched (see
+     get_gap_clusters): a new cluster starts after a gap of more than 48
+     days.
 
     Parameters
     ----------
@@ -180,27 +356,34 @@ def plot_series_time(series_data_row, image_path='./', cmap=None):
         String of the path where the images will be saved in.
     cmap: matplotlib.colors.LinearSegmentedColormap
         Desired colormap.
+    save_file: bool
+        If True the figure is saved in its own pdf file in image_path.
+    report: bool
+        If True the figure is returned (not closed) so it can be written into
+         the report (see report_sink.save_report).
 
     Returns
     -------
-    None
+    fig: matplotlib.figure.Figure
+        The figure if report is True, None otherwise.
     """
-    logging.info('Getting plot of series over time.')
+    import matplotlib.pyplot as plt
+
     series_title = series_data_row.new_title
-    start_times = pd.to_datetime(literal_eval(series_data_row.all_start_times))
-    hour = literal_eval(series_data_row.all_start_time_hours)
-    now_time_difference = pd.Series(
-        start_times - datetime.datetime.now()
-    ).apply(lambda x: x.days).to_numpy().reshape(-1, 1)
-    clustering = DBSCAN(
-        min_samples=1,
-        eps=48
-    ).fit_predict(now_time_difference)
+    all_start_times = series_data_row.all_start_times
+    hour = series_data_row.all_start_time_hours
+    if isinstance(all_start_times, str):
+        # Series information saved as csv by previous versions of the process.
+        all_start_times = literal_eval(all_start_times)
+        hour = literal_eval(hour)
+    start_times = pd.to_datetime(all_start_times)
+    now_time_difference = (start_times - datetime.datetime.now()).days
+    clusters = get_gap_clusters(now_time_difference, eps=48)
 
     # Create figure and plot
     plt.figure(figsize=(8, 5))
     ax = plt.gca()
-    plt.scatter(start_times, hour, c=clustering, cmap=cmap)
+    plt.scatter(start_times, hour, c=clusters, cmap=cmap)
     plt.plot(start_times, hour, linestyle='--', alpha=0.5, color='k')
     plt.ylabel('Hora del día')
     plt.xlabel('Fecha')
@@ -209,19 +392,14 @@ def plot_series_time(series_data_row, image_path='./', cmap=None):
     plt.ylim(-0.5, 24.5)
     plt.grid(linestyle='--')
     ax.patch.set_facecolor('gainsboro')
-    clean_title_text = clean_text(series_title)
-    save_name = f'{image_path}img2_series__{clean_title_text}.pdf'
-    plt.savefig(
-        save_name,
-        bbox_inches='tight'
-    )
-    logging.info(f'Saving plot into {save_name}')
-
-    plt.close()
+    save_name = f'{image_path}{get_series_file_name(series_title)}'
+    return finish_figure(plt.gcf(), save_name if save_file else None, report)
 
 
+@instrumented
 def generate_calendarlike_plot(netflix_data, image_path='./', cmap=None,
-                               filter_profile_name=''):
+                               filter_profile_name='', save_file=True,
+                               report=False):
     """
     This function produces a calendar-like plot with the pivot table generated
      inside with the function create_calendar_pivot_table.
@@ -230,7 +408,7 @@ def generate_calendarlike_plot(netflix_data, image_path='./', cmap=None,
     ----------
     netflix_data: pd.DataFrame
         Processed netflix data obtained from the get_processed_netflix_data
-         function.
+         function (or its daily aggregation obtained from get_daily_data).
     image_path: str
         String of the path where the images will be saved in.
     cmap: matplotlib.colors.LinearSegmentedColormap
@@ -238,12 +416,21 @@ def generate_calendarlike_plot(netflix_data, image_path='./', cmap=None,
     filter_profile_name: str
         The netflix_data comes with a column called profile_name, thus it can
         be filtered.
+    save_file: bool
+        If True the figure is saved in its own pdf file in image_path.
+    report: bool
+        If True the figure is returned (not closed) so it can be written into
+         the report (see report_sink.save_report).
 
     Returns
     -------
-    None
+    fig: matplotlib.figure.Figure
+        The figure if report is True, None otherwise.
 
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     logging.info('Getting calendarlike plot.')
 
     additional_string = ''
@@ -267,101 +454,81 @@ def generate_calendarlike_plot(netflix_data, image_path='./', cmap=None,
     plt.title(title)
     plt.xlabel('Número de mes')
     plt.ylabel('Año')
-    save_name = f'{image_path}img3_netflix_horas_mes_anio.pdf'
-    if additional_string:
-        save_name = f'{image_path}img3_netflix_horas_mes_anio' \
-                    f'__{filter_profile_name}.pdf'
-    logging.info(f'Saving plot into {save_name}')
-    plt.savefig(save_name, bbox_inches='tight')
-    plt.close()
-
-    nan_calendarized = calendarized.copy()
-    for col in nan_calendarized.columns:
-        nan_calendarized[col] = np.nan
-    animation_path = os.path.join(image_path, 'animations')
-    temporary_table_path = os.path.join(animation_path, 'temporary_tables')
-
-    figure_name = 'calendar_tmp'
-    if additional_string:
-        figure_name += f'__{filter_profile_name}'
+    file_name, animation_name = get_calendar_file_names(filter_profile_name)
+    save_name = f'{image_path}{file_name}'
+    fig = finish_figure(
+        plt.gcf(), save_name if save_file else None, report
+    )
 
-    figures_path_tmp = os.path.join(temporary_table_path, figure_name)
+    animation_path = os.path.join(image_path, 'animations')
     create_folder(animation_path)
-    create_folder(temporary_table_path)
-    create_folder(figures_path_tmp)
-    for row in nan_calendarized.index:
-        for col in nan_calendarized.columns:
-            if not np.isnan(calendarized[col].loc[row]):
-                nan_calendarized[col].loc[row] = calendarized[col].loc[row]
-                plt.figure(figsize=(20, 10))
-                sns.heatmap(
-                    nan_calendarized,
-                    annot=True,
-                    linewidth=.5,
-                    vmin=calendarized.min().min(),
-                    vmax=calendarized.max().max(),
-                    cmap=cmap,
-                )
-                title = 'Horas totales vistas de Netflix cada mes'
-                if additional_string:
-                    title += additional_string
-                plt.title(title)
-                plt.xlabel('Número de mes')
-                plt.ylabel('Año')
-
-                save_fig_name = f'{figures_path_tmp}/' \
-                                f'figure_{row}_{str(col).zfill(2)}'
-                if additional_string:
-                    save_fig_name += f'__{filter_profile_name}'
-                plt.savefig(
-                    f'{save_fig_name}.png', bbox_inches='tight'
-                )
-                plt.close()
-    gifname = 'heatmap'
-    if additional_string:
-        gifname += f'__{filter_profile_name}'
-    generate_gif_with_extra_info(
-        figures_path_tmp,
-        animation_path,
-        name=gifname
+    total_frames = int(calendarized.notna().sum().sum())
+    save_gif(
+        generate_calendarlike_frames(calendarized, title, cmap),
+        os.path.join(animation_path, animation_name),
+        duration=get_gif_durations(total_frames),
+        tight=True,
     )
-    delete_folder(figures_path_tmp)
+    return fig
 
 
-def animate_df_total_time(netflix_data, days=5):
-    ''' This is a helper function to animate the total_time by filtering over
-    time the dataframe
+def generate_calendarlike_frames(calendarized, title, cmap=None):
+    """
+    Generator of the frames of the calendar-like animation, each frame shows
+     one more month of the pivot table than the previous one.
+
+    The heatmap is drawn only once with every month hidden; each frame
+     reveals the color and the annotation of one more month.
 
     Parameters
     ----------
-    netflix_data: pd.DataFrame
-        Data from netflix.
-    days: int
-        The number of days that are taken into account when iterating for a
-        slight increase on the registers.
-
-    Returns
-    -------
-    dataframe_over_time: pd.DataFrame
-        A dataframe with the desired time condition so it can be properly
-        animated.
-    '''
-    logging.info(f'Using a time delta of {days} days.')
-    time_delta = datetime.timedelta(days=days)
-    upper_time_border = netflix_data.start_time.min() + time_delta
-    time_condition = netflix_data.start_time <= upper_time_border
-    logging.info('Filtering data with the time condition.')
-    dataframe_over_time = netflix_data[time_condition]
-    logging.info('Getting last value (since it is a cumulative sum).')
-    new_rows = dataframe_over_time.groupby('profile_name').max().reset_index()
-    new_rows.start_time = netflix_data.start_time.min() + time_delta
-    logging.info(
-        'Appending the last value to the dataframe for a proper animation.'
-    )
-    dataframe_over_time = dataframe_over_time.append(new_rows)
-    return dataframe_over_time
+    calendarized: pd.DataFrame
+        Pivot table given by create_calendar_pivot_table.
+    title: str
+        Title of the plot.
+    cmap: matplotlib.colors.LinearSegmentedColormap
+        Desired colormap.
 
+    Yields
+    ------
+    fig: matplotlib.figure.Figure
+        The same figure updated for each frame (it is closed at the end).
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
+    fig = plt.figure(figsize=(20, 10))
+    ax = sns.heatmap(
+        calendarized,
+        annot=True,
+        linewidth=.5,
+        vmin=calendarized.min().min(),
+        vmax=calendarized.max().max(),
+        cmap=cmap,
+    )
+    plt.title(title)
+    plt.xlabel('Número de mes')
+    plt.ylabel('Año')
+    mesh = ax.collections[0]
+    mesh_shape = mesh.get_array().shape
+    values = np.ma.masked_invalid(calendarized.to_numpy())
+    revealed = np.ma.masked_all(values.shape)
+    # The annotation of each cell is centered in it.
+    annotations = {}
+    for text in ax.texts:
+        x, y = text.get_position()
+        annotations[(int(y), int(x))] = text
+        text.set_visible(False)
+    # Months are revealed by year and then by month.
+    for row, col in zip(*np.nonzero(~np.ma.getmaskarray(values))):
+        revealed[row, col] = values[row, col]
+        mesh.set_array(revealed.reshape(mesh_shape))
+        annotations[(row, col)].set_visible(True)
+        yield fig
+    plt.close(fig)
+
+
+@instrumented
 def animate_total_time(netflix_data, colormap, image_path='./', dayspeed=5):
     '''
     This function gets the netflix data and creates a gif on the total amount
@@ -370,7 +537,8 @@ def animate_total_time(netflix_data, colormap, image_path='./', dayspeed=5):
     Parameters
     ----------
     netflix_data: pd.DataFrame
-        Dataframe of netflix data.
+        Dataframe of netflix data (or its daily aggregation obtained from
+         get_daily_data).
     colormap: matplotlib.colors.LinearSegmentedColormap
         The desired colormap resampled (given a number from 0 to 1 a color of
          the colormap will return a corresponding value mapped into 100
@@ -412,226 +580,275 @@ def animate_total_time(netflix_data, colormap, image_path='./', dayspeed=5):
     days_passing = list(range(0, total_days, dayspeed))
     animation_path = os.path.join(image_path, 'animations')
     logging.info(f'Animation path:{animation_path}')
-    temporary_table_path = os.path.join(
-        animation_path, 'temporary_tables'
-    )
-    figures_path_tmp = os.path.join(
-        temporary_table_path, 'cumsum_overtime_tmp')
-
-    logging.info('Creating folders')
     create_folder(animation_path)
-    create_folder(temporary_table_path)
-    create_folder(figures_path_tmp)
-
-    for day in days_passing:
-        fig = plt.figure()
-        ax = plt.gca()
-        nf_temporal = animate_df_total_time(netflix_data, day)
-        logging.info(f'Graph each profile in day: {day}')
-        for profile in sorted(profile_dict.keys()):
-            nf_temporal_p = nf_temporal[nf_temporal.profile_name == profile]
-            new_row = nf_temporal[
-                nf_temporal.start_time == nf_temporal.start_time.max()].copy()
-            new_row['duration_cumsum'] = nf_temporal_p['duration_cumsum'].max()
-            nf_temporal_p_actualized = nf_temporal_p.append(new_row)
-            nf_temporal_p_actualized.plot(
-                x='start_time',
-                y='duration_cumsum',
-                ax=ax,
-                label=profile,
-                color=profile_dict[profile],
-            )
-            plt.scatter(
-                [nf_temporal_p_actualized.start_time.max()],
-                [nf_temporal_p_actualized.duration_cumsum.max()],
-                color=profile_dict[profile],
-            )
-        plt.title('Tiempo total viendo Netflix')
-        plt.ylabel('Tiempo (horas)')
-        plt.xlabel('Fecha')
-        number = str(day).zfill(4)
-        plt.savefig(f'{figures_path_tmp}/figure_{number}.png')
-        plt.close()
 
     logging.info('Generating GIF...')
-    generate_gif(figures_path_tmp, animation_path)
-    delete_folder(figures_path_tmp)
+    save_gif(
+        generate_total_time_frames(netflix_data, profile_dict, days_passing),
+        os.path.join(animation_path, TOTAL_TIME_ANIMATION_FILE),
+        duration=15,
+    )
 
 
-def generate_gif(figures_path_tmp, animation_path, name='image'):
+def generate_total_time_frames(netflix_data, profile_dict, days_passing):
     """
-    This function creates a gif from a bunch of saved images (in a folder).
+    Generator of the frames of the total time animation, one frame for each
+     of the days that have passed since the first register.
+
+    The figure and its lines are created only once: the cumulative sum of
+     each profile is split by profile beforehand and each frame only updates
+     the data of the lines and of the markers, so the cost of a frame does
+     not grow with the number of frames.
 
     Parameters
     ----------
-    figures_path_tmp: str
-        path to the figures.
-    animation_path: str
-        path to the animation (where should the resulting file be)
-    name:
-        name of the animation.
-
-    Returns
-    -------
-    None
-
+    netflix_data: pd.DataFrame
+        Dataframe of netflix data sorted by start_time with the
+         duration_cumsum of each profile.
+    profile_dict: dict
+        Color of each profile.
+    days_passing: list
+        Days since the first register of each frame.
+
+    Yields
+    ------
+    fig: matplotlib.figure.Figure
+        The same figure updated for each frame (it is closed at the end).
     """
-    fp_in = f"{figures_path_tmp}/figure_*.png"
-    fp_out = f"{animation_path}/{name}.gif"
-    logging.info(f'Reading files from path: {figures_path_tmp}')
-    imgs = (Image.open(f) for f in sorted(glob.glob(fp_in)))
-    img = next(imgs)
-    logging.info(f'Saving Gif in {fp_out}')
-    img.save(
-        fp=fp_out,
-        format='GIF',
-        append_images=imgs,
-        save_all=True,
-        duration=15,
-        loop=0
-    )
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    first_time = mdates.date2num(netflix_data.start_time.min())
+    profile_data = dict(tuple(netflix_data.groupby('profile_name')))
+    profile_artists = []
+    for profile in sorted(profile_dict.keys()):
+        if profile not in profile_data:
+            continue
+        data = profile_data[profile]
+        line, = ax.plot([], [], label=profile, color=profile_dict[profile])
+        marker, = ax.plot([], [], 'o', color=profile_dict[profile])
+        profile_artists.append((
+            mdates.date2num(data.start_time.to_numpy()),
+            data.duration_cumsum.to_numpy(),
+            line,
+            marker,
+        ))
+    ax.xaxis_date()
+    fig.autofmt_xdate()
+    ax.legend()
+    plt.title('Tiempo total viendo Netflix')
+    plt.ylabel('Tiempo (horas)')
+    plt.xlabel('Fecha')
+    for day in days_passing:
+        upper_time = first_time + day
+        for start_times, duration_cumsum, line, marker in profile_artists:
+            seen = np.searchsorted(start_times, upper_time, side='right')
+            if not seen:
+                continue
+            # The last value is kept until the upper time of the frame.
+            last_cumsum = duration_cumsum[seen - 1]
+            line.set_data(
+                np.append(start_times[:seen], upper_time),
+                np.append(duration_cumsum[:seen], last_cumsum),
+            )
+            marker.set_data([upper_time], [last_cumsum])
+        ax.relim()
+        ax.autoscale_view()
+        yield fig
+    plt.close(fig)
 
 
-def generate_gif_with_extra_info(
-    figures_path_tmp, animation_path, name='image',
-):
+def get_gif_durations(total_frames):
     """
-    This function creates a gif with extra information; it takes into account
-    the amount of images and assigns a different duration to each transitions
-    in order to create a better gif.
+    This function gets the duration of each frame of a gif with extra
+    information; it takes into account the amount of frames and assigns a
+    different duration to each transition in order to create a better gif.
 
     Parameters
     ----------
-    figures_path_tmp: str
-        path to the figures.
-    animation_path: str
-        path to the animation (where should the resulting file be)
-    name:
-        name of the animation.
+    total_frames: int
+        Number of frames of the gif.
 
     Returns
     -------
-    None
+    time_list: list
+        Duration of each frame in milliseconds.
 
     """
-    fp_in = f"{figures_path_tmp}/figure_*.png"
-    fp_out = f"{animation_path}/{name}.gif"
-    logging.info(f'Reading files from path: {figures_path_tmp}')
-
-    dirlist = os.listdir(figures_path_tmp)
-    total_imgs = len(dirlist)
-    logging.info(f'Total files: {total_imgs}')
+    logging.info(f'Total frames: {total_frames}')
 
     max_time = 100
     min_time = 20
-    alpha = (max_time / (total_imgs) ** 2)
+    alpha = (max_time / (total_frames) ** 2)
 
-    actual_max_time = max_time + min_time
-    time_vec_x = np.linspace(-total_imgs, 0, total_imgs)
+    time_vec_x = np.linspace(-total_frames, 0, total_frames)
     time_vec = alpha * (time_vec_x) ** 2 + min_time
     time_list = list(time_vec)
     time_list[-1] = 1000
-
-    imgs = (Image.open(f) for f in sorted(glob.glob(fp_in)))
-    img = next(imgs)
-    logging.info(f'Saving gif in path: {fp_out}')
-    img.save(
-        fp=fp_out,
-        format='GIF',
-        append_images=imgs,
-        save_all=True,
-        duration=time_list,
-        loop=0,
-    )
+    return time_list
 
 
-def generate_report(image_path, report_path):
+@instrumented
+def process(netflix_data=None, series_info=None, interim_data_path=None,
+            report_path=None, force=False, workers=1, save_figures=True):
     """
-    This function grabs all the .pdf files that are in the image_path location
-    and then merges them into a single .pdf file saved in the following file:
-    {report_path}/report.pdf.
+    Main process function. The process is skipped if the interim data did not
+     change since the last time the report was generated.
 
     Parameters
     ----------
-    image_path: str
-        Os path to the image location.
+    netflix_data: pd.DataFrame
+        Processed netflix data (with the duration in seconds) as returned by
+         the movies_and_series process. If not given it is read from the
+         interim data.
+    series_info: pd.DataFrame
+        Series information of profile_0 as returned by the movies_and_series
+         process. If not given it is read from the interim data.
+    interim_data_path: str
+        Folder of the interim data, data/interim by default.
     report_path: str
-        Os path to the report file location.
-    Returns
-    -------
-    None
-    """
-    merger = PdfMerger()
-    for pdf_file in os.listdir(image_path):
-        if pdf_file.endswith('.pdf'):
-            merger.append(f'{image_path}{pdf_file}')
-
-    merger.write(f"{report_path}report.pdf")
-    merger.close()
-
-
-def process():
-    """
-    Main process function.
+        Folder where the figures and the report are saved, reports by
+         default.
+    force: bool
+        If True the process is done even if it is cached.
+    workers: int
+        Number of processes used to render the figures (see render_figures).
+    save_figures: bool
+        If True every figure is also saved in its own pdf file in the figures
+         folder, otherwise only the report (and the animations) are saved.
 
     Returns
     -------
     None
     """
-    tick = perf_counter()
     colormap = initialize_configuration()
     general_path = os.path.join(os.path.dirname(__file__), '..', '..')
-    data_path = os.path.join(general_path, 'data')
-    interim_data_path = os.path.join(data_path, 'interim')
+    interim_data_path = interim_data_path or os.path.join(
+        general_path, 'data/interim'
+    )
     interest_data_file = os.path.join(
         interim_data_path,
-        'netflix_data.csv'
+        'netflix_data.parquet'
     )
     interest_series_file = os.path.join(
         interim_data_path,
-        'profile_0_series_info.csv'
+        'profile_0_series_info.parquet'
+    )
+    report_path = os.path.join(
+        report_path or os.path.join(general_path, 'reports'), ''
     )
-    report_path = os.path.join(general_path, 'reports/')
     images_data_path = os.path.join(report_path, 'figures/')
-
-    netflix_data = get_processed_netflix_data(interest_data_file)
-    series_data = get_general_sorted_data(
-        interest_series_file,
-        sorted_by='total_duration_hours',
-        limit_rows=30
+    cache_path = os.path.join(interim_data_path, 'stage_cache')
+    fingerprint = get_stage_fingerprint(
+        inputs=[
+            interest_data_file,
+            interest_series_file,
+            __file__,
+            fetch_information.__file__,
+            schema.__file__,
+            frame_sink.__file__,
+            report_sink.__file__,
+            clustering.__file__,
+            visualization_utils.__file__,
+        ],
+        params={
+            'report_path': os.path.abspath(report_path),
+            'save_figures': save_figures,
+        },
     )
+    if not force and is_stage_cached(STAGE_NAME, fingerprint, cache_path):
+        return None
+
+    netflix_data_columns = [
+        'profile_name',
+        'start_time',
+        'end_time',
+        'duration',
+    ]
+    series_columns = [
+        'new_title',
+        'all_start_times',
+        'all_start_time_hours',
+        'total_duration_hours',
+    ]
+    if netflix_data is None:
+        netflix_data = get_processed_netflix_data(
+            interest_data_file,
+            columns=netflix_data_columns,
+        )
+    else:
+        netflix_data = get_duration_in_hours(
+            netflix_data[netflix_data_columns]
+        )
+    if series_info is None:
+        series_data = get_general_sorted_data(
+            interest_series_file,
+            sorted_by='total_duration_hours',
+            limit_rows=30,
+            columns=series_columns,
+        )
+    else:
+        series_data = sort_and_limit_data(
+            series_info[series_columns],
+            sorted_by='total_duration_hours',
+            limit_rows=30,
+        )
 
-    get_stacked_profile_duration(netflix_data, images_data_path, colormap)
-    get_stacked_profile_proportion(netflix_data, images_data_path, colormap)
-
-    animate_total_time(
-        netflix_data,
-        colormap=colormap,
-        image_path=images_data_path
-    )
-    generate_calendarlike_plot(
-        netflix_data=netflix_data,
-        image_path=images_data_path,
-        cmap=colormap,
+    # Every chart over time is built from the daily aggregation, so their
+    # cost depends on the number of days instead of the number of registers.
+    daily_data = get_daily_data(netflix_data)
+
+    # The shared folder is created before rendering so parallel tasks do not
+    # race to create it.
+    create_folder(os.path.join(images_data_path, 'animations'))
+
+    # The report pages are in the order of the tasks. The animation has no
+    # page, it goes first since it is the slowest task.
+    figure_params = {
+        'image_path': images_data_path,
+        'cmap': colormap,
+        'save_file': save_figures,
+        'report': True,
+    }
+    render_tasks = [
+        (
+            animate_total_time,
+            (daily_data,),
+            {'colormap': colormap, 'image_path': images_data_path},
+        ),
+        (get_stacked_profile_duration, (daily_data,), figure_params),
+        (get_stacked_profile_proportion, (daily_data,), figure_params),
+    ]
+    series_data = series_data.sort_values(
+        'total_duration_hours', ascending=False
     )
-    for profile in netflix_data.profile_name.unique():
-        generate_calendarlike_plot(
-            netflix_data=netflix_data,
-            image_path=images_data_path,
-            cmap=colormap,
-            filter_profile_name=profile,
+    for _, series_data_row in series_data.iterrows():
+        render_tasks.append(
+            (plot_series_time, (series_data_row,), figure_params)
         )
-    series_data.sort_values('total_duration_hours', ascending=False)\
-        .apply(
-            plot_series_time,
-            image_path=images_data_path,
-            cmap=colormap,
-            axis=1,
-        )
-    generate_report(images_data_path, report_path)
-    tock = perf_counter()
-    time_it_took = tock - tick
-    logging.info(f'Extracting files took {time_it_took} seconds.')
+    render_tasks.append(
+        (generate_calendarlike_plot, (daily_data,), figure_params)
+    )
+    profiles = daily_data.profile_name.unique()
+    for profile in profiles:
+        render_tasks.append((
+            generate_calendarlike_plot,
+            (daily_data[daily_data.profile_name == profile],),
+            dict(figure_params, filter_profile_name=profile),
+        ))
+    save_report(
+        render_figures(render_tasks, workers=workers),
+        f'{report_path}report.pdf',
+    )
+    save_stage_fingerprint(
+        STAGE_NAME,
+        fingerprint,
+        get_output_paths(
+            report_path, series_data.new_title, profiles, save_figures
+        ),
+        cache_path,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,187 @@
+import io
+import logging
+import numpy as np
+import struct
+
+
+GIF_HEADER = b'GIF89a'
+GIF_TRAILER = b';'
+EXTENSION_INTRODUCER = 0x21
+IMAGE_SEPARATOR = 0x2C
+COLOR_TABLE_FLAG = 0x80
+COLOR_TABLE_SIZE_MASK = 0x07
+TIGHT_PAD_INCHES = 0.1
+
+
+def get_tight_crop_box(fig):
+    """
+    Get the box (in pixels) that crops a figure the same way savefig does
+     with bbox_inches='tight'.
+
+    Parameters
+    ----------
+    fig: matplotlib.figure.Figure
+        Figure already drawn in its canvas.
+
+    Returns
+    -------
+    crop_box: tuple
+        Left, upper, right and lower pixel coordinates of the box.
+    """
+    width, height = fig.canvas.get_width_height()
+    bbox = fig.get_tightbbox(fig.canvas.get_renderer()).padded(
+        TIGHT_PAD_INCHES
+    )
+    left, lower, right, upper = np.array(bbox.extents) * fig.dpi
+    crop_box = (
+        max(int(left), 0),
+        max(int(height - upper), 0),
+        min(int(np.ceil(right)), width),
+        min(int(np.ceil(height - lower)), height),
+    )
+    return crop_box
+
+
+def get_figure_image(fig, crop_box=None):
+    """
+    Rasterizes a figure into an image in memory (no file is written).
+
+    Parameters
+    ----------
+    fig: matplotlib.figure.Figure
+        Desired figure.
+    crop_box: tuple
+        If given, box (in pixels) to which the image is cropped.
+
+    Returns
+    -------
+    image: PIL.Image.Image
+        RGB image of the figure.
+    """
+    from PIL import Image
+
+    fig.canvas.draw()
+    image = Image.frombuffer(
+        'RGBA',
+        fig.canvas.get_width_height(),
+        fig.canvas.buffer_rgba(),
+    ).convert('RGB')
+    if crop_box:
+        image = image.crop(crop_box)
+    return image
+
+
+def get_gif_frame(image, duration):
+    """
+    Encodes an image as a single frame of an animated GIF. Pillow encodes the
+     image as a GIF file, then its color table is moved into the frame (as a
+     local color table) and a graphic control extension with the duration of
+     the frame is added.
+
+    Parameters
+    ----------
+    image: PIL.Image.Image
+        Image of the frame.
+    duration: int
+        Duration of the frame in milliseconds.
+
+    Returns
+    -------
+    frame: bytes
+        Graphic control extension, image descriptor, color table and image
+         data of the frame.
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format='GIF')
+    gif = buffer.getvalue()
+    flags = gif[10]
+    position = 13
+    color_table = b''
+    if flags & COLOR_TABLE_FLAG:
+        color_table_size = 3 * 2 ** ((flags & COLOR_TABLE_SIZE_MASK) + 1)
+        color_table = gif[position:position + color_table_size]
+        position += color_table_size
+    while gif[position] == EXTENSION_INTRODUCER:
+        # Skip the extension label and its data sub-blocks.
+        position += 2
+        while gif[position]:
+            position += gif[position] + 1
+        position += 1
+    if gif[position] != IMAGE_SEPARATOR:
+        raise ValueError('The encoded GIF has no image descriptor.')
+    descriptor = bytearray(gif[position:position + 10])
+    image_data = gif[position + 10:-len(GIF_TRAILER)]
+    if color_table and not descriptor[9] & COLOR_TABLE_FLAG:
+        descriptor[9] |= COLOR_TABLE_FLAG | (flags & COLOR_TABLE_SIZE_MASK)
+    else:
+        color_table = b''
+    graphic_control = struct.pack(
+        '<BBBBHBB', EXTENSION_INTRODUCER, 0xF9, 4, 0, int(duration / 10), 0, 0
+    )
+    frame = graphic_control + bytes(descriptor) + color_table + image_data
+    return frame
+
+
+def save_gif(figures, gif_path, duration=15, loop=0, tight=False):
+    """
+    Saves an animated GIF from the figures of an iterable. Each figure is
+     rasterized in memory and written into the GIF file before the next one
+     is drawn, so only one frame is kept in memory at a time and no temporary
+     images are written. Closing the figures is left to the iterable.
+
+    Parameters
+    ----------
+    figures: iterable
+        Iterable (usually a generator) of matplotlib figures, one per frame.
+    gif_path: str
+        Path of the resulting GIF file.
+    duration: int or list
+        Duration of the frames in milliseconds (one value for all of them or
+         one value for each frame).
+    loop: int
+        Number of times the GIF is repeated (0 repeats it forever).
+    tight: bool
+        If True the frames are cropped like savefig with bbox_inches='tight'.
+         The crop is computed with the first frame and used for all of them.
+
+    Returns
+    -------
+    total_frames: int
+        Number of frames saved.
+    """
+    logging.info(f'Saving gif in path: {gif_path}')
+    crop_box = None
+    gif_size = None
+    gif_file = None
+    total_frames = 0
+    try:
+        for number, fig in enumerate(figures):
+            if tight and crop_box is None:
+                fig.canvas.draw()
+                crop_box = get_tight_crop_box(fig)
+            image = get_figure_image(fig, crop_box)
+            if gif_file is None:
+                gif_size = image.size
+                gif_file = open(gif_path, 'wb')
+                gif_file.write(
+                    GIF_HEADER
+                    + struct.pack('<HHBBB', *gif_size, 0, 0, 0)
+                    + b'!\xff\x0bNETSCAPE2.0'
+                    + struct.pack('<BBHB', 3, 1, loop, 0)
+                )
+            elif image.size != gif_size:
+                image = image.crop((0, 0, *gif_size))
+            if isinstance(duration, (int, float)):
+                frame_duration = duration
+            else:
+                frame_duration = duration[number]
+            gif_file.write(get_gif_frame(image, frame_duration))
+            total_frames += 1
+        if gif_file is None:
+            raise ValueError(f'There are no frames to save in {gif_path}.')
+        gif_file.write(GIF_TRAILER)
+    finally:
+        if gif_file is not None:
+            gif_file.close()
+    logging.info(f'Saved {total_frames} frames into {gif_path}')
+    return total_frames
@@ -0,0 +1,72 @@
+import logging
+
+from src.instrumentation import instrumented
+
+
+def finish_figure(fig, save_name=None, report=False):
+    """
+    Saves a figure in its own file and closes it, unless it is kept to be
+     written into the report (see save_report).
+
+    Parameters
+    ----------
+    fig: matplotlib.figure.Figure
+        Desired figure.
+    save_name: str
+        Path of the file of the figure, if not given no file is written.
+    report: bool
+        If True the figure is not closed and it is returned.
+
+    Returns
+    -------
+    fig: matplotlib.figure.Figure
+        The figure if report is True, None otherwise.
+    """
+    import matplotlib.pyplot as plt
+
+    if save_name:
+        fig.savefig(save_name, bbox_inches='tight')
+        # Called for every figure, so it only logs in the verbose mode.
+        logging.debug('Saving plot into %s', save_name)
+    if report:
+        return fig
+    plt.close(fig)
+    return None
+
+
+@instrumented
+def save_report(figures, report_path):
+    """
+    Writes figures into a multi-page pdf file as they are produced, one page
+     per figure in the order of the iterable. Each page is written directly
+     from its figure (no pdf file is read again) and the figure is closed
+     right after, so only the figures that are not written yet are kept in
+     memory.
+
+    Parameters
+    ----------
+    figures: iterable
+        Iterable (usually a generator) of matplotlib figures, None values are
+         skipped.
+    report_path: str
+        Path of the pdf file.
+
+    Returns
+    -------
+    total_pages: int
+        Number of pages written.
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    logging.info(f'Saving report in path: {report_path}')
+    total_pages = 0
+    with PdfPages(report_path) as report:
+        for fig in figures:
+            if fig is None:
+                continue
+            report.savefig(fig, bbox_inches='tight')
+            plt.close(fig)
+            total_pages += 1
+    logging.info(f'Saved {total_pages} pages into {report_path}')
+    return total_pages
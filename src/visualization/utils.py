@@ -1,10 +1,41 @@
 import logging
 import os
-import pandas as pd
 import shutil
 import unidecode
 
 
+def get_daily_data(netflix_data):
+    """
+    Aggregates the netflix data by profile and day. Every chart over time
+     (stacked areas, calendars and cumulative sums) can be built from this
+     aggregation, which has one row per day watched by each profile instead
+     of one row per register.
+
+    Parameters
+    ----------
+    netflix_data: pd.DataFrame
+        A data frame that must contain the profile name, the start and end
+         time and the duration.
+
+    Returns
+    -------
+    daily_data: pd.DataFrame
+        A data frame with the profile_name, the day as start_time, the total
+         duration of the day and the last end_time of the day.
+    """
+    logging.info('Aggregating netflix data by profile and day.')
+    daily_data = netflix_data.groupby(
+        ['profile_name', netflix_data.start_time.dt.floor('D')],
+        observed=True,
+    ).agg(
+        duration=('duration', 'sum'),
+        end_time=('end_time', 'max'),
+    ).reset_index()
+    # Profiles are used as column names of pivot tables.
+    daily_data['profile_name'] = daily_data.profile_name.astype(str)
+    return daily_data
+
+
 def create_calendar_pivot_table(netflix_data):
     """
     Obtains a pivot table with calendar-like features, where the columns are
@@ -20,6 +51,8 @@ def create_calendar_pivot_table(netflix_data):
     calendarized: pd.DataFrame
         A data frame with columns as months and rows as year.
     """
+    import pandas as pd
+
     grouper = create_grouper(freq='M')
     calendar_year = netflix_data.groupby(grouper).duration.sum().reset_index()
     calendar_year.duration = calendar_year.duration
@@ -35,6 +68,8 @@ def create_calendar_pivot_table(netflix_data):
 
 
 def get_pivoted_data(netflix_data):
+    import pandas as pd
+
     groupers = [
         create_grouper(), 'profile_name']
     _grouped_netflix_data = netflix_data.groupby(groupers)
@@ -70,6 +105,8 @@ def create_grouper(key='start_time', freq='2M'):
     grouper: pd.Grouper
         Pandas grouper over time.
     """
+    import pandas as pd
+
     grouper = pd.Grouper(
         key=key,
         freq=freq,
@@ -127,7 +164,7 @@ def colorfunc(desired_list, colormap, val):
 
 def create_folder(folder_path):
     """
-    Creates a folder in the desired path.
+    Creates a folder (and its missing parent folders) in the desired path.
 
     Parameters
     ----------
@@ -142,7 +179,7 @@ def create_folder(folder_path):
     existence = os.path.exists(folder_path)
     if not existence:
         logging.info(f'Creating folder {folder_path}')
-        os.mkdir(folder_path)
+        os.makedirs(folder_path)
     else:
         logging.info('Folder already exists')
 